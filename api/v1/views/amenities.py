@@ -3,16 +3,18 @@
 
 from flask import jsonify, abort, make_response, request
 from api.v1.views import app_views
+from api.v1.views.conditional import conditional, object_etag
+from api.v1.views.pagination import paginate
+from api.v1.views.response_cache import cached
 from models import storage
 from models.amenity import Amenity
 
 
 @app_views.route('/amenities', methods=['GET'])
+@cached("Amenity")
 def get_all_amenities():
     """Get all amenities from the storage."""
-    amenities = storage.all(Amenity)
-    amenity_list = [value.to_dict() for value in amenities.values()]
-    return make_response(jsonify(amenity_list), 200)
+    return paginate(Amenity)
 
 
 @app_views.route('/amenities/<amenity_id>', methods=['GET'])
@@ -21,7 +23,9 @@ def get_amenity_by_id(amenity_id):
     amenity_by_id = storage.get(Amenity, amenity_id)
     if not amenity_by_id:
         abort(404)
-    return make_response(jsonify(amenity_by_id.to_dict()), 200)
+    return conditional(object_etag(amenity_by_id),
+                       lambda: make_response(
+                           jsonify(amenity_by_id.to_dict()), 200))
 
 
 @app_views.route('/amenities/<amenity_id>', methods=['DELETE'])
@@ -62,6 +66,6 @@ def update_amenity(amenity_id):
         return make_response("Not a JSON", 400)
 
     setattr(amenity_by_id, 'name', body_request.get('name'))
-    storage.save()
+    amenity_by_id.save()
 
     return make_response(jsonify(amenity_by_id.to_dict()), 200)
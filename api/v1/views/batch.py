@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+"""Implement bulk create/update/delete views"""
+
+import datetime
+from collections import namedtuple
+from api.v1.views import app_views
+from flask import abort, jsonify, make_response, request
+from models import storage
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+
+# cls: model class, required: fields a create must give, references:
+# fields holding the id of an object of another class, updatable: fields
+# an update may change
+Resource = namedtuple('Resource', 'cls required references updatable')
+
+RESOURCES = {
+    'states': Resource(State, ['name'], {}, ['name']),
+    'amenities': Resource(Amenity, ['name'], {}, ['name']),
+    'users': Resource(User, ['email', 'password'], {},
+                      ['first_name', 'last_name', 'email', 'password']),
+    'cities': Resource(City, ['state_id', 'name'], {'state_id': State},
+                       ['name']),
+    'places': Resource(Place, ['city_id', 'user_id', 'name'],
+                       {'city_id': City, 'user_id': User},
+                       ['name', 'description', 'number_rooms',
+                        'number_bathrooms', 'max_guest', 'price_by_night',
+                        'latitude', 'longitude']),
+    'reviews': Resource(Review, ['place_id', 'user_id', 'text'],
+                        {'place_id': Place, 'user_id': User}, ['text']),
+}
+IGNORED = ('id', 'created_at', 'updated_at', '__class__')
+
+
+@app_views.route('/<resource>/batch', methods=['POST'])
+def batch(resource):
+    """Create, update and delete many objects of a resource, given as
+    {"create": [{...}], "update": [{"id": ..., ...}], "delete": [ids]},
+    after validating all of them, and save them with a single write"""
+    if resource not in RESOURCES:
+        abort(404)
+    res = RESOURCES[resource]
+
+    body_request = request.get_json(silent=True)
+    if not isinstance(body_request, dict):
+        return make_response("Not a JSON", 400)
+    creates = body_request.get('create', [])
+    updates = body_request.get('update', [])
+    deletes = body_request.get('delete', [])
+    if not all(isinstance(ops, list) for ops in (creates, updates, deletes)):
+        return make_response("Not a JSON", 400)
+
+    errors = validate(res, creates, updates, deletes)
+    if errors:
+        return make_response(jsonify({"errors": errors}), 400)
+
+    now = datetime.datetime.now()
+    created = []
+    for attributes in creates:
+        obj = res.cls()
+        for key, value in attributes.items():
+            if key not in IGNORED:
+                setattr(obj, key, value)
+        created.append(obj.id)
+    existing = {obj.id: obj for obj in storage.get_many(
+        res.cls, [attributes['id'] for attributes in updates] + deletes)}
+    for attributes in updates:
+        obj = existing[attributes['id']]
+        for key in res.updatable:
+            if key in attributes:
+                setattr(obj, key, attributes[key])
+        obj.updated_at = now
+    for obj_id in deletes:
+        storage.delete(existing[obj_id])
+    storage.save()
+
+    return jsonify({"created": created,
+                    "updated": [attributes['id'] for attributes in updates],
+                    "deleted": deletes}), 200
+
+
+def validate(res, creates, updates, deletes):
+    """Return the errors found in the operations, each as a dictionary
+    giving the operation, its index and the message"""
+    errors = []
+    for index, attributes in enumerate(creates):
+        if not isinstance(attributes, dict):
+            errors.append(error('create', index, "Not a JSON"))
+            continue
+        for field in res.required:
+            if not attributes.get(field):
+                errors.append(error('create', index, "Missing " + field))
+            elif field in res.references and \
+                    not isinstance(attributes[field], str):
+                errors.append(error('create', index, "Invalid " + field))
+    for index, attributes in enumerate(updates):
+        if not isinstance(attributes, dict):
+            errors.append(error('update', index, "Not a JSON"))
+        elif not attributes.get('id'):
+            errors.append(error('update', index, "Missing id"))
+        elif not isinstance(attributes['id'], str):
+            errors.append(error('update', index, "Invalid id"))
+    for index, obj_id in enumerate(deletes):
+        if not isinstance(obj_id, str):
+            errors.append(error('delete', index, "Invalid id"))
+    if errors:
+        return errors
+
+    # look every referenced object up once per class
+    for field, cls in res.references.items():
+        ids = {attributes[field] for attributes in creates}
+        found = {obj.id for obj in storage.get_many(cls, ids)}
+        for index, attributes in enumerate(creates):
+            if attributes[field] not in found:
+                errors.append(error('create', index,
+                                    cls.__name__ + " not found"))
+    ids = [attributes['id'] for attributes in updates] + deletes
+    found = {obj.id for obj in storage.get_many(res.cls, ids)}
+    for index, attributes in enumerate(updates):
+        if attributes['id'] not in found:
+            errors.append(error('update', index, "Not found"))
+    for index, obj_id in enumerate(deletes):
+        if obj_id not in found:
+            errors.append(error('delete', index, "Not found"))
+    if len(set(deletes)) != len(deletes):
+        errors.append(error('delete', None, "Duplicate id"))
+    return errors
+
+
+def error(op, index, message):
+    """Return the description of an invalid operation"""
+    return {"op": op, "index": index, "error": message}
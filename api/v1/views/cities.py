@@ -2,6 +2,8 @@
 """Implement city view"""
 
 from api.v1.views import app_views
+from api.v1.views.conditional import (collection_etag, conditional,
+                                      object_etag)
 from flask import abort, jsonify, make_response, request
 from models import storage
 from models.city import City
@@ -14,16 +16,24 @@ def get_cities(state_id):
     state = storage.get(State, state_id)
     if not state:
         abort(404)
-    cities = [obj.to_dict() for obj in state.cities]
-    return make_response(jsonify(cities), 200)
+
+    def build():
+        """list the cities of the state"""
+        cities = [obj.to_dict() for obj in
+                  storage.children(City, "state_id", [state_id])[state_id]]
+        return make_response(jsonify(cities), 200)
+
+    return conditional(collection_etag(City), build)
 
 
 @app_views.route('/cities/<city_id>', methods=['GET'])
 def get_city(city_id):
     """get city by id"""
     city = storage.get(City, city_id)
-    return make_response(jsonify(city.to_dict()),
-                         200) if city else abort(404)
+    if not city:
+        abort(404)
+    return conditional(object_etag(city),
+                       lambda: make_response(jsonify(city.to_dict()), 200))
 
 
 @app_views.route('/cities/<city_id>', methods=['DELETE'])
@@ -64,5 +74,5 @@ def update_city(city_id):
     if not req_city:
         return make_response("Not a JSON", 400)
     setattr(city, 'name', req_city.get('name'))
-    storage.save()
+    city.save()
     return make_response(city.to_dict(), 200)
@@ -0,0 +1,36 @@
+#!/usr/bin/python3
+"""Implement ETags and conditional GET for the views"""
+
+from flask import make_response, request
+from hashlib import md5
+from models import storage
+
+
+def object_etag(obj):
+    """Return the ETag of a single object, derived from its class, id and
+    last update"""
+    key = "{}.{}@{}".format(obj.__class__.__name__, obj.id,
+                            obj.updated_at.isoformat())
+    return md5(key.encode()).hexdigest()
+
+
+def collection_etag(*classes):
+    """Return the ETag of a listing of objects of the given classes (all
+    of them when none is given), derived from their storage generations
+    and the requested path and query string"""
+    generations = [storage.generation(cls) for cls in classes or [None]]
+    key = "{} {}".format(";".join(generations), request.full_path)
+    return md5(key.encode()).hexdigest()
+
+
+def conditional(etag, build):
+    """Return 304 Not Modified if the client holds etag, otherwise the
+    response returned by build(), tagged with etag.
+
+    build is only called when the body has to be sent."""
+    if request.if_none_match.contains_weak(etag):
+        response = make_response('', 304)
+    else:
+        response = make_response(build())
+    response.set_etag(etag)
+    return response
@@ -2,8 +2,11 @@
 """Implement different routes"""
 
 from api.v1.views import app_views
+from api.v1.views.response_cache import cache
 from flask import jsonify
 from models import storage
+from os import getenv
+import time
 
 from models.amenity import Amenity
 from models.city import City
@@ -12,27 +15,43 @@ from models.review import Review
 from models.state import State
 from models.user import User
 
+# seconds a /stats snapshot is served before counting again (0 disables)
+STATS_TTL = float(getenv('HBNB_API_STATS_TTL', 0))
+stats_cache = {"counts": None, "expires": 0.0}
+
 
 @app_views.route('/status')
 def status():
-    """Return status: ok"""
-    return jsonify({"status": "OK"})
+    """Return status: ok, with the counters of the storage"""
+    return jsonify({"status": "OK", "storage": storage.metrics()})
+
+
+@app_views.route('/cache_stats')
+def cache_stats():
+    """Return the counters of the response cache"""
+    if cache is None:
+        return jsonify({"backend": None})
+    return jsonify(cache.stats())
 
 
 @app_views.route('/stats')
 def count_objs():
     """Return json that have objects and their counts"""
-    objs = {
-        "amenities": Amenity,
-        "cities": City,
-        "places": Place,
-        "reviews": Review,
-        "states": State,
-        "users": User
+    now = time.monotonic()
+    if stats_cache["counts"] is None or now >= stats_cache["expires"]:
+        objs = {
+            "amenities": Amenity,
+            "cities": City,
+            "places": Place,
+            "reviews": Review,
+            "states": State,
+            "users": User
+            }
+
+        counts = storage.counts()
+        stats_cache["counts"] = {
+          key: counts.get(value.__name__, 0) for key, value in objs.items()
         }
+        stats_cache["expires"] = now + STATS_TTL
 
-    count_objs = {
-      key: storage.count(value) for key, value in objs.items()
-    }
-
-    return jsonify(count_objs)
+    return jsonify(stats_cache["counts"])
@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+"""Implement keyset pagination for collection views"""
+
+import json
+from itertools import islice
+from api.v1.views.conditional import collection_etag, conditional
+from flask import (Response, abort, jsonify, make_response, request,
+                   stream_with_context, url_for)
+from models import storage
+from os import getenv
+
+# page size used when a request gives no limit (0 returns everything)
+PAGE_SIZE = int(getenv('HBNB_API_PAGE_SIZE', 0))
+NDJSON = 'application/x-ndjson'
+# number of objects handed to serialize at once when streaming
+STREAM_BATCH = 100
+
+
+def to_dicts(objs):
+    """Return the dictionary representations of objs"""
+    return [obj.to_dict() for obj in objs]
+
+
+def paginate(cls, serialize=to_dicts, depends_on=(), **filters):
+    """Return a response listing one page of the objects of cls matching
+    filters, ordered by id, with a Link header to the next page.
+
+    serialize turns a list of objects into their JSON representations,
+    so views can embed related objects with one lookup per page; the
+    classes of those objects are listed in depends_on for the ETag."""
+    try:
+        limit = int(request.args.get('limit', PAGE_SIZE))
+    except ValueError:
+        abort(400, "Invalid limit")
+    if limit < 0:
+        abort(400, "Invalid limit")
+    after = request.args.get('after')
+
+    def build():
+        """list the page, or stream it if asked to"""
+        mimetype = stream_mimetype()
+        if mimetype:
+            return stream(mimetype, cls, limit or None, after, serialize,
+                          **filters)
+        return page(cls, limit, after, serialize, **filters)
+
+    return conditional(collection_etag(cls, *depends_on), build)
+
+
+def page(cls, limit, after, serialize=to_dicts, **filters):
+    """Return a response listing up to limit objects of cls after the id
+    after, with a Link header to the next page if there is one"""
+    objs = storage.page(cls, limit + 1 if limit else None, after, **filters)
+    has_next = limit and len(objs) > limit
+    if has_next:
+        objs = objs[:limit]
+
+    response = make_response(jsonify(serialize(objs)), 200)
+    if has_next:
+        cursor = objs[-1].id
+        # keep the other query arguments, such as expand, on the next page
+        args = request.args.to_dict(flat=False)
+        args.update(limit=limit, after=cursor, **request.view_args)
+        next_url = url_for(request.endpoint, _external=True, **args)
+        response.headers['Link'] = '<{}>; rel="next"'.format(next_url)
+        response.headers['X-Next-Cursor'] = cursor
+    return response
+
+
+def stream_mimetype():
+    """Return the mimetype to stream the response as, or None if the
+    client did not ask for NDJSON or for ?stream=1"""
+    if request.accept_mimetypes.best_match(['application/json',
+                                            NDJSON]) == NDJSON:
+        return NDJSON
+    if request.args.get('stream') in ('1', 'true'):
+        return 'application/json'
+    return None
+
+
+def stream(mimetype, cls, limit, after, serialize=to_dicts, **filters):
+    """Return a chunked response encoding the objects as they come out of
+    storage, STREAM_BATCH at a time, as NDJSON or as a JSON array.
+
+    The next page starts after the id of the last object received, as
+    the cursor is only known once the body has been sent."""
+    objs = storage.stream(cls, limit, after, **filters)
+
+    def dicts():
+        """yield the serialized objects batch by batch"""
+        while True:
+            batch = list(islice(objs, STREAM_BATCH))
+            if not batch:
+                return
+            yield from serialize(batch)
+
+    if mimetype == NDJSON:
+        lines = (json.dumps(obj) + "\n" for obj in dicts())
+        return Response(stream_with_context(lines), 200, mimetype=NDJSON)
+
+    def encode():
+        """yield the JSON array piece by piece"""
+        separator = "["
+        for obj in dicts():
+            yield separator + json.dumps(obj)
+            separator = ","
+        yield "[]" if separator == "[" else "]"
+
+    return Response(stream_with_context(encode()), 200,
+                    mimetype='application/json')
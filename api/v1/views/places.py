@@ -1,6 +1,9 @@
 #!/usr/bin/python3
 """Implement places view"""
 from api.v1.views import app_views
+from api.v1.views.conditional import conditional, object_etag
+from api.v1.views.pagination import paginate
+from api.v1.views.response_cache import cached
 from flask import jsonify, abort, make_response, request
 from models import storage
 from models.city import City
@@ -9,24 +12,27 @@ from models.user import User
 
 
 @app_views.route('/cities/<city_id>/places', methods=['GET'])
+@cached("Place", "City.{city_id}")
 def get_places(city_id):
     """Get all places by specific city id."""
     city_by_id = storage.get(City, city_id)
     if not city_by_id:
         abort(404)
 
-    place_list = [place.to_dict() for place in city_by_id.places]
-    return make_response(jsonify(place_list), 200)
+    return paginate(Place, city_id=city_id)
 
 
 @app_views.route('/places/<place_id>', methods=['GET'])
+@cached("Place.{place_id}")
 def get_places_by_id(place_id):
     """Return place based on a corresponding id"""
     places_by_id = storage.get(Place, place_id)
     if not places_by_id:
         abort(404)
 
-    return make_response(jsonify(places_by_id.to_dict()), 200)
+    return conditional(object_etag(places_by_id),
+                       lambda: make_response(
+                           jsonify(places_by_id.to_dict()), 200))
 
 
 @app_views.route('/places/<place_id>', methods=['DELETE'])
@@ -86,6 +92,20 @@ def update_place(place_id):
     for attribute in attributes_to_update:
         setattr(place_by_id, attribute,
                 body_request.get(attribute, getattr(place_by_id, attribute)))
-    storage.save()
+    place_by_id.save()
 
     return make_response(jsonify(place_by_id.to_dict()), 200)
+
+
+@app_views.route('/places_search', methods=['POST'])
+def search_places():
+    """Search places by states, cities and amenities"""
+    body_request = request.get_json(silent=True)
+    if not isinstance(body_request, dict):
+        return make_response("Not a JSON", 400)
+
+    places = storage.search_places(body_request.get('states'),
+                                   body_request.get('cities'),
+                                   body_request.get('amenities'))
+
+    return make_response(jsonify([place.to_dict() for place in places]), 200)
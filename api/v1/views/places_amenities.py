@@ -4,7 +4,9 @@
 from flask import abort, jsonify
 
 from api.v1.views import app_views
+from api.v1.views.conditional import collection_etag, conditional
 from models import storage
+from models.amenity import Amenity
 from models.place import Place
 
 
@@ -16,6 +18,10 @@ def get_amenities_by_place_id(place_id):
     if not place_by_id:
         abort(404)
 
-    amenities_list = [amenity.to_dict() for amenity in place_by_id.amenities]
+    def build():
+        """list the amenities of the place"""
+        amenities_list = [amenity.to_dict() for amenity in
+                          storage.get_many(Amenity, place_by_id.amenity_ids)]
+        return jsonify(amenities_list), 200
 
-    return jsonify(amenities_list), 200
+    return conditional(collection_etag(Place, Amenity), build)
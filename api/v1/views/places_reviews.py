@@ -3,6 +3,8 @@
 
 from flask import jsonify, abort, request
 from api.v1.views import app_views
+from api.v1.views.conditional import conditional, object_etag
+from api.v1.views.pagination import paginate
 from models import storage
 from models.review import Review
 from models.place import Place
@@ -17,9 +19,26 @@ def get_reviews_by_place_id(place_id):
     if not place_by_id:
         abort(404)
 
-    reviews = [review.to_dict() for review in place_by_id.reviews]
+    expand = request.args.get('expand', '').split(',')
+    if 'user' in expand:
+        return paginate(Review, expand_users, depends_on=[User],
+                        place_id=place_id)
+    return paginate(Review, place_id=place_id)
 
-    return jsonify(reviews), 200
+
+def expand_users(reviews):
+    """Return the reviews as dictionaries embedding the public fields of
+    their authors, fetched with a single lookup"""
+    user_ids = {review.user_id for review in reviews}
+    users = {user.id: {'id': user.id, 'first_name': user.first_name,
+                       'last_name': user.last_name}
+             for user in storage.get_many(User, user_ids)}
+    reviews_list = []
+    for review in reviews:
+        review_dict = review.to_dict()
+        review_dict['user'] = users.get(review.user_id)
+        reviews_list.append(review_dict)
+    return reviews_list
 
 
 @app_views.route('/reviews/<review_id>', methods=['GET'])
@@ -30,7 +49,8 @@ def get_review_by_id(review_id):
     if not review_by_id:
         abort(404)
 
-    return jsonify(review_by_id.to_dict()), 200
+    return conditional(object_etag(review_by_id),
+                       lambda: (jsonify(review_by_id.to_dict()), 200))
 
 
 @app_views.route('/reviews/<review_id>', methods=['DELETE'])
@@ -90,6 +110,6 @@ def update_review(review_id):
         abort(400, "Not a JSON")
 
     review_by_id.text = body_request.get('text', review_by_id.text)
-    storage.save()
+    review_by_id.save()
 
     return jsonify(review_by_id.to_dict()), 200
@@ -0,0 +1,262 @@
+#!/usr/bin/python3
+"""Implement a response cache for read views, invalidated by storage"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, make_response, request
+from models import storage
+from os import getenv
+
+# backend of the response cache: "memory", "sqlite" or unset to disable it
+CACHE_BACKEND = getenv('HBNB_API_CACHE')
+# maximum number of responses kept, and seconds each one is served
+CACHE_SIZE = int(getenv('HBNB_API_CACHE_SIZE', 1024))
+CACHE_TTL = float(getenv('HBNB_API_CACHE_TTL', 60))
+# database file shared by the processes using the sqlite backend
+CACHE_PATH = getenv('HBNB_API_CACHE_PATH', 'api_cache.sqlite')
+
+
+class MemoryBackend:
+    """Keeps the most recently used entries in this process"""
+
+    def __init__(self, max_entries, ttl):
+        """Hold at most max_entries entries for ttl seconds each"""
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.tags = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Return the entry stored under key, or None"""
+        with self.lock:
+            item = self.entries.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                self.__drop(key)
+                return None
+            self.entries.move_to_end(key)
+            return item[1]
+
+    def set(self, key, value, tags):
+        """Store value under key, tagged with tags, and return the number
+        of least recently used entries evicted to make room"""
+        with self.lock:
+            self.__drop(key)
+            self.entries[key] = (time.monotonic() + self.ttl, value, tags)
+            for tag in tags:
+                self.tags.setdefault(tag, set()).add(key)
+            evicted = 0
+            while len(self.entries) > self.max_entries:
+                self.__drop(next(iter(self.entries)))
+                evicted += 1
+            return evicted
+
+    def invalidate(self, tags):
+        """Drop the entries carrying any of tags, or all if tags is None"""
+        with self.lock:
+            if tags is None:
+                self.entries.clear()
+                self.tags.clear()
+                return
+            for tag in tags:
+                for key in list(self.tags.get(tag, ())):
+                    self.__drop(key)
+
+    def __len__(self):
+        """Return the number of entries"""
+        return len(self.entries)
+
+    def __drop(self, key):
+        """Remove key and its tags"""
+        item = self.entries.pop(key, None)
+        if item is None:
+            return
+        for tag in item[2]:
+            keys = self.tags.get(tag)
+            keys.discard(key)
+            if not keys:
+                del self.tags[tag]
+
+
+class SQLiteBackend:
+    """Keeps entries in a SQLite database shared by several processes"""
+
+    def __init__(self, path, max_entries, ttl):
+        """Hold at most max_entries entries for ttl seconds each in the
+        database at path"""
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        with self.__connect() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT "
+                       "PRIMARY KEY, value TEXT, expires REAL, used REAL)")
+            db.execute("CREATE TABLE IF NOT EXISTS tags (tag TEXT, key TEXT)")
+            db.execute("CREATE INDEX IF NOT EXISTS tags_tag ON tags (tag)")
+            db.execute("CREATE INDEX IF NOT EXISTS tags_key ON tags (key)")
+
+    def __connect(self):
+        """Open a connection, one per call so threads never share one"""
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get(self, key):
+        """Return the entry stored under key, or None"""
+        with self.__connect() as db:
+            row = db.execute("SELECT value, expires FROM entries "
+                             "WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= time.time():
+                self.__drop(db, [key])
+                return None
+            db.execute("UPDATE entries SET used = ? WHERE key = ?",
+                       (time.time(), key))
+            return json.loads(row[0])
+
+    def set(self, key, value, tags):
+        """Store value under key, tagged with tags, and return the number
+        of least recently used entries evicted to make room"""
+        now = time.time()
+        with self.__connect() as db:
+            self.__drop(db, [key])
+            db.execute("INSERT INTO entries VALUES (?, ?, ?, ?)",
+                       (key, json.dumps(value), now + self.ttl, now))
+            db.executemany("INSERT INTO tags VALUES (?, ?)",
+                           [(tag, key) for tag in tags])
+            extra = db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            extra -= self.max_entries
+            if extra <= 0:
+                return 0
+            oldest = [row[0] for row in db.execute(
+                "SELECT key FROM entries ORDER BY used LIMIT ?", (extra,))]
+            self.__drop(db, oldest)
+            return len(oldest)
+
+    def invalidate(self, tags):
+        """Drop the entries carrying any of tags, or all if tags is None"""
+        with self.__connect() as db:
+            if tags is None:
+                db.execute("DELETE FROM entries")
+                db.execute("DELETE FROM tags")
+                return
+            tags = list(tags)
+            marks = ",".join("?" * len(tags))
+            keys = [row[0] for row in db.execute(
+                "SELECT DISTINCT key FROM tags WHERE tag IN ({})"
+                .format(marks), tags)]
+            self.__drop(db, keys)
+
+    def __len__(self):
+        """Return the number of entries"""
+        with self.__connect() as db:
+            return db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @staticmethod
+    def __drop(db, keys):
+        """Remove the entries under keys and their tags"""
+        rows = [(key,) for key in keys]
+        db.executemany("DELETE FROM entries WHERE key = ?", rows)
+        db.executemany("DELETE FROM tags WHERE key = ?", rows)
+
+
+class ResponseCache:
+    """Counts the hits, misses and evictions of a backend and drops the
+    entries of objects as storage reports them changed"""
+
+    def __init__(self, backend):
+        """Wrap backend"""
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # bumped on every invalidation, so a response built while an
+        # object changed is not stored
+        self.version = 0
+
+    def get(self, key):
+        """Return the entry stored under key, or None"""
+        entry = self.backend.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def set(self, key, value, tags, version):
+        """Store value under key unless the cache was invalidated since
+        version was read"""
+        if version == self.version:
+            self.evictions += self.backend.set(key, value, tags)
+
+    def invalidate(self, keys):
+        """Drop the entries tagged with the <class name>.<id> keys or with
+        their class names, or every entry if keys is None"""
+        self.version += 1
+        if keys is None:
+            self.backend.invalidate(None)
+            return
+        tags = set(keys)
+        tags.update(key.split('.', 1)[0] for key in keys)
+        self.backend.invalidate(tags)
+
+    def stats(self):
+        """Return the counters of the cache"""
+        return {"backend": type(self.backend).__name__,
+                "entries": len(self.backend),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions}
+
+
+if CACHE_BACKEND == 'sqlite':
+    cache = ResponseCache(SQLiteBackend(CACHE_PATH, CACHE_SIZE, CACHE_TTL))
+elif CACHE_BACKEND == 'memory':
+    cache = ResponseCache(MemoryBackend(CACHE_SIZE, CACHE_TTL))
+else:
+    cache = None
+if cache is not None:
+    storage.subscribe(cache.invalidate)
+
+
+def cached(*tags):
+    """Cache the 200 responses of the decorated view by path, query string
+    and Accept header.
+
+    tags are formatted with the view arguments, e.g. "Place.{place_id}",
+    and the response is dropped when an object whose <class name>.<id>
+    key or class name matches one of them is created, saved or deleted."""
+    def decorator(view):
+        """wrap view"""
+        @wraps(view)
+        def wrapper(**kwargs):
+            """serve the response from the cache when possible"""
+            if cache is None:
+                return view(**kwargs)
+            key = "{} {}".format(request.full_path,
+                                 request.headers.get('Accept', ''))
+            entry = cache.get(key)
+            if entry is not None:
+                response = Response(entry["body"], entry["status"],
+                                    headers=entry["headers"])
+                etag = response.get_etag()[0]
+                if etag and request.if_none_match.contains_weak(etag):
+                    response = make_response('', 304)
+                    response.set_etag(etag)
+                return response
+
+            version = cache.version
+            response = make_response(view(**kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                entry = {"body": response.get_data(as_text=True),
+                         "status": response.status_code,
+                         "headers": list(response.headers.items())}
+                cache.set(key, entry,
+                          [tag.format(**kwargs) for tag in tags], version)
+            return response
+        return wrapper
+    return decorator
@@ -2,24 +2,29 @@
 """states route"""
 
 from api.v1.views import app_views
+from api.v1.views.conditional import conditional, object_etag
+from api.v1.views.pagination import paginate
+from api.v1.views.response_cache import cached
 from flask import abort, jsonify, make_response, request
 from models import storage
 from models.state import State
 
 
 @app_views.route('/states', methods=['GET'])
+@cached("State")
 def get_states():
     """get a list of states"""
-    states = [obj.to_dict() for obj in storage.all(State).values()]
-    return make_response(jsonify(states), 200)
+    return paginate(State)
 
 
 @app_views.route('/states/<state_id>', methods=['GET'])
 def get_state_by_id(state_id):
     """get state by id"""
     state = storage.get(State, state_id)
-    return make_response(jsonify(state.to_dict()),
-                         200) if state else abort(404)
+    if not state:
+        abort(404)
+    return conditional(object_etag(state),
+                       lambda: make_response(jsonify(state.to_dict()), 200))
 
 
 @app_views.route('/states', methods=['POST'])
@@ -45,7 +50,7 @@ def update_state(state_id):
     if not new_state:
         return make_response("Not a JSON", 400)
     setattr(cur_state, 'name', new_state.get('name'))
-    storage.save()
+    cur_state.save()
     return make_response(cur_state.to_dict(), 200)
 
 
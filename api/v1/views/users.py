@@ -2,6 +2,9 @@
 """Implement users view"""
 
 from api.v1.views import app_views
+from api.v1.views.conditional import (collection_etag, conditional,
+                                      object_etag)
+from api.v1.views.pagination import paginate
 from flask import jsonify, abort, make_response, request
 from models import storage
 from models.user import User
@@ -9,10 +12,13 @@ from models.user import User
 
 @app_views.route('/users', methods=['GET'])
 def get_all_user():
-    """Get all users from the storage."""
-    users = storage.all(User)
-    user_list = [value.to_dict() for value in users.values()]
-    return make_response(jsonify(user_list), 200)
+    """Get all users from the storage, or only those listed in ?ids=."""
+    ids = request.args.get('ids')
+    if ids is not None:
+        ids = [id for id in ids.split(',') if id]
+        return conditional(collection_etag(User), lambda: jsonify(
+            [user.to_dict() for user in storage.get_many(User, ids)]))
+    return paginate(User)
 
 
 @app_views.route('/users/<user_id>', methods=['GET'])
@@ -21,7 +27,8 @@ def get_user_by_id(user_id):
     user_by_id = storage.get(User, user_id)
     if not user_by_id:
         abort(404)
-    return jsonify(user_by_id.to_dict())
+    return conditional(object_etag(user_by_id),
+                       lambda: jsonify(user_by_id.to_dict()))
 
 
 @app_views.route('/users/<user_id>', methods=['DELETE'])
@@ -69,6 +76,6 @@ def update_user(user_id):
     for attribute in attributes_to_update:
         setattr(user_by_id, attribute,
                 body_request.get(attribute, getattr(user_by_id, attribute)))
-    storage.save()
+    user_by_id.save()
 
     return make_response(jsonify(user_by_id.to_dict()), 200)
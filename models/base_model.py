@@ -3,12 +3,102 @@
 
 import datetime
 import uuid
+from os import getenv
+
 import models
 
+TIME_FORMAT: str = "%Y-%m-%dT%H:%M:%S.%f"
+# store the declared fields of every model in __slots__
+COMPACT_MODELS: bool = getenv("HBNB_COMPACT_MODELS") == "1"
+# keep timestamps loaded from storage as strings until they are first read
+LAZY_TIMESTAMPS: bool = (getenv("HBNB_LAZY_TIMESTAMPS") == "1"
+                         and not COMPACT_MODELS)
+
+
+def parse_datetime(value: str) -> datetime.datetime:
+    """parse an ISO 8601 timestamp, falling back to the legacy format"""
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return datetime.datetime.strptime(value, TIME_FORMAT)
+
+
+class _RawTimestamp(str):
+    """ISO 8601 timestamp loaded from storage and not parsed yet"""
+
+
+class _Timestamp:
+    """datetime attribute that parses a _RawTimestamp on first read"""
+
+    def __set_name__(self, owner, name) -> None:
+        """remember the attribute name"""
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        """return the datetime, parsing it if it is still raw"""
+        if obj is None:
+            return self
+        try:
+            value = obj.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+        if isinstance(value, _RawTimestamp):
+            value = parse_datetime(value)
+            obj.__dict__[self.name] = value
+        return value
+
+    def __set__(self, obj, value) -> None:
+        """store the value in the instance dictionary"""
+        obj.__dict__[self.name] = value
+
+
+def _compact_getattr(self, name):
+    """fall back to the class default of an unset compact field"""
+    try:
+        return self._defaults[name]
+    except KeyError:
+        raise AttributeError(f"'{self.__class__.__name__}' object "
+                             f"has no attribute '{name}'") from None
 
-class BaseModel:
+
+class _ModelMeta(type):
+    """Lays the annotated fields of a model out in __slots__ when
+    HBNB_COMPACT_MODELS=1, keeping their class values as defaults"""
+
+    def __new__(mcs, name, bases, namespace):
+        """create the model class"""
+        if not COMPACT_MODELS:
+            return super().__new__(mcs, name, bases, namespace)
+
+        fields = tuple(namespace.get("__annotations__", {}))
+        defaults = {}
+        for base in reversed(bases):
+            defaults.update(getattr(base, "_defaults", {}))
+        for field in fields:
+            value = namespace.pop(field, None)
+            if value is not None and not hasattr(value, "__get__"):
+                defaults[field] = value
+        namespace["__slots__"] = fields
+        if not any(isinstance(base, _ModelMeta) for base in bases):
+            namespace["__slots__"] += ("__dict__", "__weakref__")
+            namespace["__getattr__"] = _compact_getattr
+        namespace["_defaults"] = defaults
+
+        cls = super().__new__(mcs, name, bases, namespace)
+        cls._slots = (getattr(cls, "_slots", ()) +
+                      tuple(cls.__dict__[field] for field in fields))
+        return cls
+
+
+class BaseModel(metaclass=_ModelMeta):
     """Defines all common attributes/methods for other classes"""
 
+    id: str
+    created_at: datetime.datetime = _Timestamp()
+    updated_at: datetime.datetime = _Timestamp()
+    # slot descriptors of the compact layout, in declaration order
+    _slots = ()
+
     def __init__(self, *args, **kwargs) -> None:
         """init new or old object"""
         if not kwargs:
@@ -24,12 +114,35 @@ class BaseModel:
         """create new instance from dictionary input"""
         for k, value in kwargs.items():
             if k in ["updated_at", "created_at"]:
-                time_format: str = "%Y-%m-%dT%H:%M:%S.%f"
-                time: datetime = datetime.datetime.strptime(value, time_format)
-                setattr(self, k, time)
+                if not isinstance(value, str):
+                    raise TypeError(f"{k} must be an ISO 8601 string")
+                if LAZY_TIMESTAMPS:
+                    super().__setattr__(k, _RawTimestamp(value))
+                else:
+                    super().__setattr__(k, parse_datetime(value))
                 continue
             if k != "__class__":
-                setattr(self, k, value)
+                super().__setattr__(k, value)
+
+    @classmethod
+    def from_storage(cls, data: dict) -> "BaseModel":
+        """rebuild a stored instance from its dictionary without running
+        __init__, keeping its timestamps unparsed until first read"""
+        if COMPACT_MODELS:
+            return cls(**data)
+        obj = cls.__new__(cls)
+        instance_dict = {k: v for k, v in data.items() if k != "__class__"}
+        for k in ["created_at", "updated_at"]:
+            if isinstance(instance_dict.get(k), str):
+                instance_dict[k] = _RawTimestamp(instance_dict[k])
+        # bypass __setattr__: loading an object does not change it
+        object.__setattr__(obj, "__dict__", instance_dict)
+        return obj
+
+    def __setattr__(self, name, value) -> None:
+        """set an attribute and mark the instance as changed in storage"""
+        super().__setattr__(name, value)
+        models.storage.mark_dirty(self)
 
     def save(self) -> None:
         """Updates the updated_at and calls storage save method"""
@@ -39,14 +152,28 @@ class BaseModel:
     def to_dict(self) -> dict:
         """returns a dictionary containing all keys/values of
             attributes and class name"""
-        instance_dict = self.__dict__.copy()
+        instance_dict = self._attributes()
         instance_dict["__class__"] = self.__class__.__name__
-        instance_dict["created_at"] = self.created_at.isoformat()
-        instance_dict["updated_at"] = self.updated_at.isoformat()
+        for k in ["created_at", "updated_at"]:
+            if isinstance(instance_dict.get(k), _RawTimestamp):
+                instance_dict[k] = str(instance_dict[k])
+            else:
+                instance_dict[k] = getattr(self, k).isoformat()
 
         return instance_dict
 
+    def _attributes(self) -> dict:
+        """returns a copy of the attributes set on the instance"""
+        attributes = {}
+        for slot in self._slots:
+            try:
+                attributes[slot.__name__] = slot.__get__(self)
+            except AttributeError:
+                continue
+        attributes.update(self.__dict__)
+        return attributes
+
     def __str__(self) -> str:
         """string representation of class"""
         class_name = self.__class__.__name__
-        return f"[{class_name}] ({self.id}) {self.__dict__}"
+        return f"[{class_name}] ({self.id}) {self._attributes()}"
@@ -11,19 +11,58 @@ from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
-from os import getenv
+from os import getenv, urandom
 import sqlalchemy
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func, literal, or_
 from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool
+import itertools
+import time
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
 
 
+class _MeteredQueuePool(QueuePool):
+    """QueuePool counting the checkouts that had to wait for a connection
+    to be returned and the time spent waiting"""
+
+    def __init__(self, *args, **kwargs):
+        """Create the pool with its counters at zero"""
+        super().__init__(*args, **kwargs)
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def _do_get(self):
+        """Check a connection out, timing it if none was idle and no new
+        one could be opened"""
+        # overflow() counts the open connections beyond pool_size, a
+        # max_overflow of -1 means there is no limit
+        if self.checkedin() or self._max_overflow < 0 or \
+                self.overflow() < self._max_overflow:
+            return super()._do_get()
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.waits += 1
+            self.wait_seconds += time.perf_counter() - started
+
+
 class DBStorage:
     """interaacts with the MySQL database"""
     __engine = None
     __session = None
+    # list - engines of the read replicas, if any
+    __replicas = []
+    # scoped_session - sessions reads go through, bound to the replicas
+    __replica_session = None
+    # string - tells generations of this process apart from other runs
+    __epoch = urandom(8).hex()
+    # int - number of changes made through this process
+    __changes = 0
+    # list - callables told the keys of objects created, saved or deleted
+    __listeners = []
 
     def __init__(self):
         """Instantiate a DBStorage object"""
@@ -32,37 +71,130 @@ class DBStorage:
         HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
         HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
         HBNB_ENV = getenv('HBNB_ENV')
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.
-                                      format(HBNB_MYSQL_USER,
-                                             HBNB_MYSQL_PWD,
-                                             HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
+        url = 'mysql+mysqldb://{}:{}@{}/{}'
+        self.__engine = create_engine(url.format(HBNB_MYSQL_USER,
+                                                 HBNB_MYSQL_PWD,
+                                                 HBNB_MYSQL_HOST,
+                                                 HBNB_MYSQL_DB),
+                                      **self.pool_options())
+        # comma separated hosts, or database URLs, of the read replicas
+        self.__replicas = []
+        for host in getenv('HBNB_MYSQL_REPLICAS', '').split(','):
+            host = host.strip()
+            if not host:
+                continue
+            if "://" not in host:
+                host = url.format(HBNB_MYSQL_USER, HBNB_MYSQL_PWD, host,
+                                  HBNB_MYSQL_DB)
+            self.__replicas.append(create_engine(host,
+                                                 **self.pool_options()))
         if HBNB_ENV == "test":
             Base.metadata.drop_all(self.__engine)
 
+    @staticmethod
+    def pool_options():
+        """returns the create_engine() pool arguments, read from the
+        HBNB_MYSQL_POOL_* environment variables"""
+        return {
+            "poolclass": _MeteredQueuePool,
+            "pool_size": int(getenv('HBNB_MYSQL_POOL_SIZE', 5)),
+            "max_overflow": int(getenv('HBNB_MYSQL_MAX_OVERFLOW', 10)),
+            "pool_timeout": float(getenv('HBNB_MYSQL_POOL_TIMEOUT', 30)),
+            # below MySQL's default wait_timeout of 8 hours
+            "pool_recycle": int(getenv('HBNB_MYSQL_POOL_RECYCLE', 3600)),
+            "pool_pre_ping": getenv('HBNB_MYSQL_POOL_PRE_PING', "1") == "1",
+        }
+
+    def metrics(self):
+        """returns the state of the connection pools"""
+        metrics = self.__pool_metrics(self.__engine)
+        if self.__replicas:
+            metrics["replicas"] = [self.__pool_metrics(engine)
+                                   for engine in self.__replicas]
+        return metrics
+
+    @staticmethod
+    def __pool_metrics(engine):
+        """returns the state of the connection pool of engine"""
+        pool = engine.pool
+        return {"pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "waits": pool.waits,
+                "wait_seconds": pool.wait_seconds}
+
     def all(self, cls=None):
         """query on the current database session"""
         new_dict = {}
         for clss in classes:
             if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
+                objs = self.__reader().query(classes[clss]).all()
                 for obj in objs:
                     key = obj.__class__.__name__ + '.' + obj.id
                     new_dict[key] = obj
         return (new_dict)
 
+    def __reader(self):
+        """returns the session reads go through: one bound to a replica,
+        unless there is none or this request already wrote"""
+        if self.__replica_session is None or \
+                self.__session.info.get("wrote"):
+            return self.__session
+        return self.__replica_session
+
+    def __writer(self):
+        """returns the primary session, marking the request as having
+        written so that its later reads see its own changes"""
+        self.__session.info["wrote"] = True
+        return self.__session
+
     def new(self, obj):
         """add the object to the current database session"""
-        self.__session.add(obj)
+        self.__writer().add(obj)
+        DBStorage.__changes += 1
+        self.__notify([obj.__class__.__name__ + '.' + obj.id])
+
+    def mark_dirty(self, obj):
+        """changes are tracked by the session, nothing to record"""
 
     def save(self):
-        """commit all changes of the current database session"""
-        self.__session.commit()
+        """commit all changes of the current database session, if any,
+        including those made to objects read from a replica"""
+        session = self.__session
+        replica = self.__replica_session
+        if replica is not None:
+            for obj in list(replica.dirty):
+                self.__writer().merge(obj)
+                replica.expunge(obj)
+        if session.new or session.dirty or session.deleted:
+            keys = [obj.__class__.__name__ + '.' + obj.id for obj in
+                    set(session.new) | set(session.dirty) |
+                    set(session.deleted)]
+            session.commit()
+            DBStorage.__changes += 1
+            self.__notify(keys)
+
+    def subscribe(self, listener):
+        """calls listener with the keys of the objects created, deleted or
+        saved from now on"""
+        self.__listeners.append(listener)
+
+    def __notify(self, keys):
+        """tells the listeners that the objects under keys changed"""
+        for listener in self.__listeners:
+            listener(keys)
 
     def delete(self, obj=None):
         """delete from the current database session obj if not None"""
         if obj is not None:
-            self.__session.delete(obj)
+            replica = self.__replica_session
+            if replica is not None and obj in replica:
+                replica.expunge(obj)
+                obj = self.__writer().merge(obj)
+            self.__writer().delete(obj)
+            DBStorage.__changes += 1
+            self.__notify([obj.__class__.__name__ + '.' + obj.id])
 
     def reload(self):
         """reloads data from the database"""
@@ -70,10 +202,22 @@ class DBStorage:
         sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
         Session = scoped_session(sess_factory)
         self.__session = Session
+        if self.__replicas:
+            # each request reads from the next replica in turn
+            replicas = itertools.cycle(self.__replicas)
+            replica_factory = sessionmaker(expire_on_commit=False)
+
+            def replica_session():
+                """opens a session on the next replica"""
+                return replica_factory(bind=next(replicas))
+
+            self.__replica_session = scoped_session(replica_session)
 
     def close(self):
-        """call remove() method on the private session attribute"""
+        """call remove() method on the private session attributes"""
         self.__session.remove()
+        if self.__replica_session is not None:
+            self.__replica_session.remove()
 
     def get(self, cls, id):
         """
@@ -83,22 +227,105 @@ class DBStorage:
         if cls not in classes.values():
             return None
 
-        all_cls = models.storage.all(cls)
-        for value in all_cls.values():
-            if (value.id == id):
-                return value
+        return self.__reader().get(cls, id)
+
+    def get_many(self, cls, ids):
+        """returns the objects of cls with the given ids that exist"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        ids = list(ids)
+        if not ids:
+            return []
+        return self.__reader().query(cls).filter(cls.id.in_(ids)).all()
 
-        return None
+    def children(self, cls, foreign_key, parent_ids=None):
+        """returns lists of the objects of cls keyed by the value of their
+        foreign_key attribute, for the given parent_ids or for all,
+        loaded with a single query"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        query = self.__reader().query(cls)
+        groups = {}
+        if parent_ids is not None:
+            groups = {parent_id: [] for parent_id in parent_ids}
+            query = query.filter(getattr(cls, foreign_key).in_(groups))
+        for obj in query:
+            groups.setdefault(getattr(obj, foreign_key), []).append(obj)
+        return groups
 
     def count(self, cls=None):
         """count the number of objects in storage"""
-        all_class = classes.values()
-
         if not cls:
-            count = 0
-            for clas in all_class:
-                count += len(models.storage.all(clas).values())
+            return sum(self.counts().values())
+        if isinstance(cls, str):
+            cls = classes.get(cls)
+        if cls not in classes.values():
+            return 0
+
+        return self.__reader().query(func.count(cls.id)).scalar()
+
+    def counts(self):
+        """returns the number of rows of every class, by class name,
+        in a single round-trip"""
+        queries = [self.__reader().query(literal(name), func.count(clss.id))
+                   for name, clss in classes.items()]
+        rows = queries[0].union_all(*queries[1:]).all()
+        return {name: count for name, count in rows}
+
+    def generation(self, cls=None):
+        """returns a token that changes whenever an object of cls, or of
+        any class if cls is None, is created, changed or deleted, built
+        from the row count and latest update of each class so that
+        writes made by other processes are seen too"""
+        if cls is None:
+            names = list(classes)
         else:
-            count = len(models.storage.all(cls).values())
+            names = [cls if isinstance(cls, str) else cls.__name__]
+        queries = [self.__reader().query(literal(name),
+                                         func.count(classes[name].id),
+                                         func.max(classes[name].updated_at))
+                   for name in names if name in classes]
+        if not queries:
+            return "{}.{}".format(self.__epoch, self.__changes)
+        rows = sorted(queries[0].union_all(*queries[1:]).all())
+        return "{}.{}:{}".format(self.__epoch, self.__changes,
+                                 ",".join("{}={}@{}".format(*row)
+                                          for row in rows))
+
+    def search_places(self, states=None, cities=None, amenities=None):
+        """returns the places, ordered by id, located in any of the given
+        states or cities (all places if none is given) that have all of
+        the given amenities; the location is filtered by the database,
+        the amenities on the amenity_ids list of each place, which has no
+        column or association table to query"""
+        query = self.__reader().query(Place)
+        if states or cities:
+            in_states = self.__reader().query(City.id).filter(
+                City.state_id.in_(states or []))
+            query = query.filter(or_(Place.city_id.in_(cities or []),
+                                     Place.city_id.in_(in_states)))
+        places = query.order_by(Place.id).all()
+        if amenities:
+            wanted = set(amenities)
+            places = [place for place in places
+                      if wanted.issubset(getattr(place, "amenity_ids", []))]
+        return places
+
+    def page(self, cls, limit=None, after=None, **filters):
+        """returns up to limit objects of cls ordered by id, starting
+        after the id after, whose attributes equal the given filters"""
+        return self.__page_query(cls, limit, after, filters).all()
+
+    def stream(self, cls, limit=None, after=None, **filters):
+        """yields the objects page() returns, fetching them in batches"""
+        return iter(self.__page_query(cls, limit, after,
+                                      filters).yield_per(100))
 
-        return count
+    def __page_query(self, cls, limit, after, filters):
+        """builds the query behind page() and stream()"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        query = self.__reader().query(cls).filter_by(**filters)
+        if after is not None:
+            query = query.filter(cls.id > after)
+        return query.order_by(cls.id).limit(limit)
@@ -3,21 +3,60 @@
 Contains the FileStorage class
 """
 
+import atexit
+import bisect
+import gc
 import json
-import models
+import multiprocessing
+import os
+import pickle
+import threading
+import time
 from models.amenity import Amenity
-from models.base_model import BaseModel
+from models.base_model import BaseModel, COMPACT_MODELS, parse_datetime
 from models.city import City
+from models.engine.serializers import FORMATS, MappedSnapshot
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
 from hashlib import md5
+from os import getenv
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
 
 
+def _decode_part(format, path, chunk, parse):
+    """returns the (key, dictionary) pairs stored in path, or in its
+    chunk, in lists by class name, without their __class__ and, if parse,
+    with their timestamps parsed so the dictionaries can become instance
+    dictionaries as they are"""
+    serializer = FORMATS[format]
+    groups = {}
+    with open(path, 'rb' if serializer.binary else 'r') as f:
+        if chunk is None:
+            items = serializer.load(f)
+        else:
+            items = serializer.load_chunk(f, chunk)
+        for key, value in items:
+            if parse:
+                for name in ("created_at", "updated_at"):
+                    if isinstance(value.get(name), str):
+                        value[name] = parse_datetime(value[name])
+            groups.setdefault(value.pop("__class__"), []).append((key, value))
+    return groups
+
+
+def _run_worker(sender, parts, format, parse):
+    """decodes the (path, chunk) parts in a forked process of a parallel
+    reload and sends each one, pickled, through the pipe sender"""
+    for path, chunk in parts:
+        sender.send_bytes(pickle.dumps(
+            _decode_part(format, path, chunk, parse), protocol=5))
+    sender.close()
+
+
 class FileStorage:
     """serializes instances to a JSON file & deserializes back to instances"""
 
@@ -25,54 +64,707 @@ class FileStorage:
     __file_path = "file.json"
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # string - snapshot format, one of serializers.FORMATS; formats other
+    # than json are stored next to __file_path with their own extension
+    __format = getenv('HBNB_FS_FORMAT', 'json')
+    # int - hash buckets per class when the snapshot is split into one file
+    # per shard, 0 keeps every object in a single snapshot
+    __shards = int(getenv('HBNB_FS_SHARDS', 0))
+    # set - paths of the shards not read since the last reload
+    __unloaded = set()
+    # int - processes decoding the snapshot on reload, shard by shard or
+    # by chunks of a records snapshot; 0 or 1 decodes it in this process
+    __reload_workers = int(getenv('HBNB_FS_RELOAD_WORKERS', 0))
+    # MappedSnapshot - indexed snapshot objects are decoded from on access
+    __mapped = None
+    # dictionary - keys of the mapped objects since decoded, replaced or
+    # deleted, by class name; the other mapped objects are still undecoded
+    __taken = {}
+    # bool - append changed objects to a journal instead of rewriting the file
+    __journal = getenv('HBNB_FS_JOURNAL') == "1"
+    # int - number of journal records that triggers a compaction
+    __compact_every = int(getenv('HBNB_FS_COMPACT_EVERY', 1000))
+    # int - number of records appended to the journal since last compaction
+    __journal_records = 0
+    # set - <class name>.id of objects changed or deleted since last save
+    __dirty = set()
+    # dict - <class name>.id to (object, dictionary) of the objects last
+    # written to the single-file snapshot, reused while they do not change
+    __records = {}
+    # tuple - (cities by state, places by city, places by amenity) ids
+    __search_index = None
+    # dictionary - sorted ids of the objects of a class, by class name
+    __sorted_ids = {}
+    # dictionary - objects grouped by foreign key value, by class name
+    __children = {}
+    # bool - adopt stored dictionaries on reload instead of running __init__
+    __lazy = getenv('HBNB_FS_LAZY') == "1"
+    # dictionary - objects of __objects bucketed by class name
+    __by_class = {}
+    # dictionary - the __objects map that __by_class was built from
+    __indexed = None
+    # bool - let close() skip reload() while the files are unchanged on disk
+    __reload_on_change = getenv('HBNB_FS_ALWAYS_RELOAD') != "1"
+    # tuple - (inode, size, mtime) of the snapshot and journal last in sync
+    __disk_state = None
+    # int - number of reloads performed / skipped by close()
+    __reloads = 0
+    __skipped_reloads = 0
+    # tuple - (objects parsed, seconds taken) by the last reload
+    __last_reload = (0, 0.0)
+    # string - tells generations of this process apart from other runs
+    __epoch = os.urandom(8).hex()
+    # int - bumped on every change to any object
+    __clock = 0
+    # dictionary - value of __clock at the last change, by class name
+    __generations = {}
+    # int - generation of the classes unchanged since __objects was replaced
+    __base_generation = 0
+    # list - callables told the keys of objects created, saved or deleted
+    __listeners = []
+    # float - seconds save() leaves for more saves to join one background
+    # write (HBNB_FS_WRITE_BEHIND is in milliseconds, 0 writes at once)
+    __flush_window = float(getenv('HBNB_FS_WRITE_BEHIND', 0)) / 1000
+    # Thread - background writer, started by the first deferred save()
+    __flusher = None
+    # Lock - guards starting __flusher, so save() never waits on a write
+    __flusher_lock = threading.Lock()
+    # Event - set when changes are waiting for the background writer
+    __flush_wanted = threading.Event()
+    # RLock - serializes writing and reading the files
+    __lock = threading.RLock()
+    # int - number of times changes were written to disk
+    __flushes = 0
 
     def all(self, cls=None):
         """returns the dictionary __objects"""
         if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
+            if not isinstance(cls, str):
+                cls = cls.__name__
+            self.__load_class(cls)
+            return dict(self.__buckets().get(cls, {}))
+        for name in classes:
+            self.__load_class(name)
         return self.__objects
 
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
             key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            self.__add(key, obj)
+            self.__dirty.add(key)
+            self.__notify([key])
+
+    def mark_dirty(self, obj):
+        """records that obj changed since it was last saved"""
+        obj_id = getattr(obj, "id", None)
+        if obj_id is not None:
+            key = obj.__class__.__name__ + "." + obj_id
+            self.__dirty.add(key)
+            self.__records.pop(key, None)
+        self.__children.pop(obj.__class__.__name__, None)
+        self.__changed(obj.__class__.__name__)
+        if obj.__class__.__name__ in ("City", "Place"):
+            FileStorage.__search_index = None
+
+    def __changed(self, name):
+        """advances the generation of the class name"""
+        FileStorage.__clock += 1
+        self.__generations[name] = self.__clock
+
+    def generation(self, cls=None):
+        """returns a token that changes whenever an object of cls, or of
+        any class if cls is None, is created, changed or deleted"""
+        self.__buckets()
+        if cls is None:
+            value = self.__clock
+        else:
+            if not isinstance(cls, str):
+                cls = cls.__name__
+            value = self.__generations.get(cls, self.__base_generation)
+        return "{}.{}".format(self.__epoch, value)
+
+    def __buckets(self):
+        """returns the per-class index, rebuilding it if __objects
+        was replaced as a whole"""
+        if FileStorage.__indexed is not self.__objects:
+            FileStorage.__by_class = {}
+            for key, obj in self.__objects.items():
+                self.__by_class.setdefault(
+                    obj.__class__.__name__, {})[key] = obj
+            FileStorage.__indexed = self.__objects
+            FileStorage.__records = {}
+            FileStorage.__unloaded = set()
+            FileStorage.__mapped = None
+            FileStorage.__taken = {}
+            FileStorage.__search_index = None
+            FileStorage.__sorted_ids = {}
+            FileStorage.__children = {}
+            FileStorage.__clock += 1
+            FileStorage.__generations = {}
+            FileStorage.__base_generation = self.__clock
+        return self.__by_class
+
+    def __add(self, key, obj, changed=True):
+        """stores obj under key in __objects and the per-class index,
+        advancing the generation of its class if changed"""
+        buckets = self.__buckets()
+        name = obj.__class__.__name__
+        bucket = buckets.setdefault(name, {})
+        was_pending = self.__unpend(key)
+        if key not in bucket and not was_pending and \
+                name in self.__sorted_ids:
+            bisect.insort(self.__sorted_ids[name], key[len(name) + 1:])
+        self.__objects[key] = obj
+        bucket[key] = obj
+        self.__children.pop(name, None)
+        if changed:
+            self.__changed(name)
+        if name in ("City", "Place"):
+            FileStorage.__search_index = None
+
+    def __discard(self, key):
+        """removes key from __objects and the per-class index"""
+        self.__buckets()
+        self.__records.pop(key, None)
+        obj = self.__objects.pop(key, None)
+        if obj is not None or self.__unpend(key):
+            name = key.split(".", 1)[0]
+            self.__buckets().get(name, {}).pop(key, None)
+            if name in self.__sorted_ids:
+                ids = self.__sorted_ids[name]
+                i = bisect.bisect_left(ids, key[len(name) + 1:])
+                if i < len(ids) and ids[i] == key[len(name) + 1:]:
+                    del ids[i]
+            self.__children.pop(name, None)
+            self.__changed(name)
+            if name in ("City", "Place"):
+                FileStorage.__search_index = None
+
+    def __unpend(self, key):
+        """forgets that the object under key waits in the mapped snapshot,
+        returning whether it did"""
+        if self.__mapped is None:
+            return False
+        taken = self.__taken.setdefault(key.split(".", 1)[0], set())
+        if key in taken or key not in self.__mapped:
+            return False
+        taken.add(key)
+        return True
+
+    def __undecoded(self, name):
+        """yields the keys of the mapped objects of the class name that
+        are not decoded yet"""
+        if self.__mapped is not None:
+            taken = self.__taken.get(name, ())
+            for key in self.__mapped.keys(name + "."):
+                if key not in taken:
+                    yield key
+
+    def __materialize(self, key):
+        """returns the object stored under key, decoding it from the
+        mapped snapshot on first access, or None"""
+        if self.__unloaded:
+            self.__load_shard(self.__shard_of(key))
+        buckets = self.__buckets()
+        obj = self.__objects.get(key)
+        if obj is None and self.__mapped is not None:
+            with self.__lock:
+                obj = self.__objects.get(key)
+                if obj is None and self.__unpend(key):
+                    obj = self.__build(self.__mapped[key])
+                    self.__objects[key] = obj
+                    buckets.setdefault(key.split(".", 1)[0], {})[key] = obj
+        return obj
+
+    def __load_shards(self, name):
+        """reads the unread shards of the class name"""
+        if self.__unloaded:
+            for path in self.__shard_paths(name):
+                self.__load_shard(path)
+
+    def __load_class(self, name):
+        """reads the unread shards and decodes every mapped object of the
+        class name"""
+        self.__load_shards(name)
+        for key in list(self.__undecoded(name)):
+            self.__materialize(key)
 
     def save(self):
-        """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            if key == "password":
-                json_objects[key].decode()
-            json_objects[key] = self.__objects[key].to_dict(save_fs=1)
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+        """serializes __objects to the JSON file (path: __file_path)
+        if any object was created, changed or deleted since last save"""
+        if not self.__dirty:
+            return
+        keys = list(self.__dirty)
+        if self.__flush_window > 0:
+            self.__schedule_flush()
+        else:
+            self.__persist()
+        self.__notify(keys)
+
+    def flush(self):
+        """writes the changes not written yet; with write-behind enabled,
+        returns once everything saved before the call is on disk"""
+        self.__persist()
+
+    def __persist(self):
+        """writes the changed objects to the journal or the snapshot"""
+        with self.__lock:
+            if not self.__dirty:
+                return
+            if self.__journal:
+                self.__append_journal()
+            else:
+                self.__write_snapshot(self.__dirty)
+            FileStorage.__flushes += 1
+
+    def __schedule_flush(self):
+        """wakes the background writer up, starting it if needed"""
+        with self.__flusher_lock:
+            if self.__flusher is None or not self.__flusher.is_alive():
+                FileStorage.__flusher = threading.Thread(
+                    target=self.__run_flusher, daemon=True)
+                self.__flusher.start()
+                atexit.register(self.flush)
+        self.__flush_wanted.set()
+
+    def __run_flusher(self):
+        """writes the changes saved during each window in one go"""
+        while True:
+            self.__flush_wanted.wait()
+            time.sleep(self.__flush_window)
+            self.__flush_wanted.clear()
+            if self.__flush_window <= 0:
+                # write-behind was turned off, save() writes by itself
+                continue
+            try:
+                self.__persist()
+            except OSError:
+                # the changes stay dirty and are retried on the next save
+                pass
+
+    def subscribe(self, listener):
+        """calls listener with the keys of the objects created, deleted or
+        saved from now on, or with None when every object may have
+        changed"""
+        self.__listeners.append(listener)
+
+    def __notify(self, keys):
+        """tells the listeners that the objects under keys changed"""
+        for listener in self.__listeners:
+            listener(keys)
+
+    def __snapshot_path(self):
+        """returns the path of the snapshot in the configured format"""
+        if self.__format == "json":
+            return self.__file_path
+        return "{}.{}".format(os.path.splitext(self.__file_path)[0],
+                              FORMATS[self.__format].extension)
+
+    def __journal_path(self):
+        """returns the path of the journal next to the snapshot"""
+        return self.__snapshot_path() + ".log"
+
+    def __shard_path(self, name, bucket=0):
+        """returns the path of the shard holding the bucket of the class
+        name"""
+        base = os.path.splitext(self.__file_path)[0]
+        extension = FORMATS[self.__format].extension
+        if self.__shards > 1:
+            return "{}.{}.{}.{}".format(base, name, bucket, extension)
+        return "{}.{}.{}".format(base, name, extension)
+
+    def __shard_paths(self, name=None):
+        """returns the paths of every shard of the class name, or of all
+        classes"""
+        names = classes if name is None else [name]
+        return [self.__shard_path(name, bucket)
+                for name in names for bucket in range(self.__shards)]
+
+    def __shard_of(self, key):
+        """returns the path of the shard the object under key belongs to"""
+        name, obj_id = key.split(".", 1)
+        bucket = 0
+        if self.__shards > 1:
+            bucket = int(md5(obj_id.encode()).hexdigest(), 16) % \
+                self.__shards
+        return self.__shard_path(name, bucket)
+
+    def __load_shard(self, path):
+        """reads the shard at path into __objects unless it was already,
+        leaving alone the objects changed since the last save, and returns
+        how many objects it holds"""
+        if path not in self.__unloaded:
+            return 0
+        with self.__lock:
+            if path not in self.__unloaded:
+                return 0
+            self.__unloaded.discard(path)
+            serializer = FORMATS[self.__format]
+            loaded = 0
+            with open(path, 'rb' if serializer.binary else 'r') as f:
+                for key, value in serializer.load(f):
+                    # the reload that found the shard already advanced
+                    # the generation, reading it changes nothing
+                    if key not in self.__dirty:
+                        self.__add(key, self.__build(value), changed=False)
+                    loaded += 1
+            return loaded
+
+    def __write_file(self, path, items):
+        """writes the (key, dictionary) pairs of items to path, replacing
+        the file only once the new one is fully on disk"""
+        serializer = FORMATS[self.__format]
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb' if serializer.binary else 'w') as f:
+            serializer.dump(items, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def __write_snapshot(self, keys=None):
+        """rewrites the snapshot with every object and drops the journal;
+        when sharded, only rewrites the shards holding keys, if given"""
+        if self.__shards:
+            if keys is None or os.path.exists(self.__journal_path()):
+                paths = {path: name for name in classes
+                         for path in self.__shard_paths(name)}
+            else:
+                paths = {self.__shard_of(key): key.split(".", 1)[0]
+                         for key in keys}
+            # a shard is rewritten whole, so it has to be read first
+            for path in paths:
+                self.__load_shard(path)
+        dirty = self.__dirty
+        FileStorage.__dirty = set()
+        try:
+            if self.__shards:
+                shards = {path: [] for path in paths}
+                for name in set(paths.values()):
+                    for key, obj in list(self.__buckets().get(name,
+                                                              {}).items()):
+                        path = self.__shard_of(key)
+                        if path in shards:
+                            shards[path].append((key, obj.to_dict()))
+                for path, items in shards.items():
+                    self.__write_file(path, items)
+            else:
+                # only the objects changed since the last write, or put in
+                # place by a reload, are turned into dictionaries again
+                records = {}
+                for key, obj in list(self.__objects.items()):
+                    record = self.__records.get(key)
+                    if record is None or record[0] is not obj:
+                        record = (obj, obj.to_dict())
+                    records[key] = record
+                items = [(key, record[1]) for key, record in records.items()]
+                # objects never decoded are copied over as stored
+                items.extend((key, self.__mapped[key]) for name in classes
+                             for key in self.__undecoded(name))
+                self.__write_file(self.__snapshot_path(), items)
+                FileStorage.__records = records
+                # objects changed while writing behind are written again
+                for key in list(self.__dirty):
+                    records.pop(key, None)
+            if self.__mapped is not None and self.__format == "indexed":
+                # map the new file so the old one can be freed; it holds
+                # every decoded object, which are thus taken from it
+                with open(self.__snapshot_path(), 'rb') as f:
+                    FileStorage.__mapped = MappedSnapshot(f)
+                FileStorage.__taken = {
+                    name: set(bucket)
+                    for name, bucket in self.__buckets().items()}
+                FileStorage.__sorted_ids = {}
+        except BaseException:
+            self.__dirty.update(dirty)
+            raise
+        if os.path.exists(self.__journal_path()):
+            os.remove(self.__journal_path())
+        FileStorage.__journal_records = 0
+        FileStorage.__disk_state = self.__stat()
+
+    def __stat(self):
+        """returns (inode, size, mtime) of the snapshot, or of every shard,
+        and of the journal"""
+        paths = self.__shard_paths() if self.__shards else \
+            [self.__snapshot_path()]
+        state = []
+        for path in paths + [self.__journal_path()]:
+            try:
+                st = os.stat(path)
+                state.append((st.st_ino, st.st_size, st.st_mtime_ns))
+            except OSError:
+                state.append(None)
+        return tuple(state)
+
+    def __append_journal(self):
+        """appends a record for every object created, updated or deleted
+        since the last save, compacting once the journal grows too long"""
+        dirty = self.__dirty
+        FileStorage.__dirty = set()
+        try:
+            records = []
+            for key in dirty:
+                obj = self.__objects.get(key)
+                if obj is None:
+                    records.append(json.dumps({"op": "del", "key": key}) +
+                                   "\n")
+                else:
+                    records.append('{{"op": "put", "key": {}, "obj": {}}}\n'
+                                   .format(json.dumps(key),
+                                           json.dumps(obj.to_dict())))
+            with open(self.__journal_path(), 'a') as f:
+                f.write("".join(records))
+        except BaseException:
+            self.__dirty.update(dirty)
+            raise
+        FileStorage.__journal_records += len(records)
+        FileStorage.__disk_state = self.__stat()
+        if self.__journal_records >= self.__compact_every:
+            self.compact()
+
+    def compact(self):
+        """folds the journal into a fresh snapshot of __objects"""
+        with self.__lock:
+            self.__write_snapshot()
 
     def reload(self):
-        """deserializes the JSON file to __objects"""
+        """deserializes the JSON file and replays its journal to __objects"""
+        with self.__lock:
+            self.__reload()
+        self.__notify(None)
+
+    def __reload(self):
+        """reads the snapshot and the journal into __objects"""
+        FileStorage.__disk_state = self.__stat()
+        FileStorage.__reloads += 1
+        started = time.perf_counter()
+        loaded = 0
         try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
+            serializer = FORMATS[self.__format]
+            if self.__shards:
+                loaded = self.__find_shards()
+            else:
+                with open(self.__snapshot_path(),
+                          'rb' if serializer.binary else 'r') as f:
+                    if self.__format == "indexed":
+                        loaded = self.__map(f)
+                    elif self.__reload_workers > 1 and \
+                            hasattr(serializer, "chunks"):
+                        loaded = self.__load_parallel(
+                            [(self.__snapshot_path(), chunk) for chunk in
+                             serializer.chunks(f, self.__reload_workers * 4)])
+                    else:
+                        for key, value in serializer.load(f):
+                            self.__add(key, self.__build(value))
+                            self.__dirty.discard(key)
+                            loaded += 1
         except:
             pass
+        self.__replay_journal()
+        FileStorage.__last_reload = (loaded, time.perf_counter() - started)
+
+    def __find_shards(self):
+        """marks the shards on disk to be read on first access, or reads
+        them all at once on __reload_workers processes or if a journal has
+        to be replayed on top, and returns how many objects were read"""
+        self.__buckets()
+        FileStorage.__unloaded = {path for path in self.__shard_paths()
+                                  if os.path.exists(path)}
+        if self.__reload_workers > 1:
+            paths = sorted(self.__unloaded)
+            FileStorage.__unloaded = set()
+            return self.__load_parallel([(path, None) for path in paths])
+        for name in classes:
+            self.__sorted_ids.pop(name, None)
+            self.__children.pop(name, None)
+            self.__changed(name)
+        FileStorage.__search_index = None
+        if not os.path.exists(self.__journal_path()):
+            return 0
+        return sum(self.__load_shard(path) for path in list(self.__unloaded))
+
+    def __map(self, f):
+        """maps the indexed snapshot open as f, leaving its objects to be
+        decoded on first access, and returns how many it holds"""
+        snapshot = MappedSnapshot(f)
+        self.__buckets()
+        FileStorage.__mapped = snapshot
+        FileStorage.__taken = {}
+        for key in [key for key in self.__objects if key in snapshot]:
+            self.__add(key, self.__build(snapshot[key]))
+        for key in [key for key in self.__dirty if key in snapshot]:
+            self.__dirty.discard(key)
+        for name in classes:
+            self.__sorted_ids.pop(name, None)
+            self.__children.pop(name, None)
+            self.__changed(name)
+        FileStorage.__search_index = None
+        return len(snapshot)
+
+    def __build(self, value):
+        """instantiates an object from its stored dictionary"""
+        cls = classes[value["__class__"]]
+        if self.__lazy:
+            return cls.from_storage(value)
+        return cls(**value)
+
+    def __load_parallel(self, parts):
+        """decodes the (path, chunk) parts of the snapshot on
+        __reload_workers forked processes, adopts the objects they hold and
+        returns how many there were"""
+        parse = not self.__lazy and not COMPACT_MODELS
+        workers = min(self.__reload_workers, len(parts))
+        # no reference cycles are created, collecting would only slow down
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            if workers < 2 or \
+                    "fork" not in multiprocessing.get_all_start_methods():
+                return sum(self.__adopt(_decode_part(self.__format, path,
+                                                     chunk, parse), parse)
+                           for path, chunk in parts)
+            return self.__fork_workers(parts, workers, parse)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def __fork_workers(self, parts, workers, parse):
+        """spreads the parts over workers forked processes and adopts the
+        objects they send back, returning how many there were"""
+        # The workers are forked while __lock is held and the write-behind
+        # thread may be running: they only read files and write to their
+        # pipe, never touching the storage, its lock or its threads, so
+        # what those held at fork time does not matter. They are started
+        # by hand because executors pickle tasks on a helper thread, which
+        # blocks on the import lock when reload() runs from import models.
+        context = multiprocessing.get_context("fork")
+        jobs = []
+        for i in range(workers):
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_run_worker, daemon=True,
+                args=(sender, parts[i::workers], self.__format, parse))
+            process.start()
+            sender.close()
+            jobs.append((process, receiver, len(parts[i::workers])))
+        loaded = 0
+        try:
+            for process, receiver, count in jobs:
+                for _ in range(count):
+                    loaded += self.__adopt(
+                        pickle.loads(receiver.recv_bytes()), parse)
+        finally:
+            for process, receiver, count in jobs:
+                receiver.close()
+                process.join()
+        return loaded
+
+    def __adopt(self, groups, parse):
+        """adds the objects of the dictionaries decoded by _decode_part,
+        making them the instance dictionaries if they were parsed, and
+        returns how many there were"""
+        buckets = self.__buckets()
+        loaded = 0
+        for name, values in groups.items():
+            cls = classes[name]
+            bucket = buckets.setdefault(name, {})
+            for key, value in values:
+                if parse:
+                    obj = cls.__new__(cls)
+                    object.__setattr__(obj, "__dict__", value)
+                else:
+                    obj = cls.from_storage(value)
+                if self.__mapped is not None:
+                    self.__unpend(key)
+                self.__objects[key] = obj
+                bucket[key] = obj
+            self.__dirty.difference_update(key for key, value in values)
+            self.__sorted_ids.pop(name, None)
+            self.__children.pop(name, None)
+            self.__changed(name)
+            loaded += len(values)
+        if "City" in groups or "Place" in groups:
+            FileStorage.__search_index = None
+        return loaded
+
+    def __replay_journal(self):
+        """applies the records of the journal on top of __objects"""
+        records = 0
+        torn = False
+        try:
+            with open(self.__journal_path(), 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        record = None
+                    if record is None or not line.endswith("\n"):
+                        # torn trailing record from an interrupted append
+                        torn = True
+                        break
+                    key = record["key"]
+                    records += 1
+                    self.__dirty.discard(key)
+                    if record["op"] == "del":
+                        self.__discard(key)
+                        continue
+                    self.__add(key, self.__build(record["obj"]))
+        except IOError:
+            pass
+        FileStorage.__journal_records = records
+        if torn:
+            self.__write_snapshot()
+
+    def update(self, key, attribute, value):
+        """sets attribute of the object stored under key, casting string
+        values to the type of the attribute's current value"""
+        obj = self.__materialize(key)
+        if obj is None:
+            raise KeyError(key)
+        if isinstance(value, str):
+            value = value.strip("\"'")
+            current = getattr(obj, attribute, None)
+            if type(current) in (int, float):
+                try:
+                    value = type(current)(value)
+                except ValueError:
+                    pass
+        setattr(obj, attribute, value)
 
     def delete(self, obj=None):
         """delete obj from __objects if it’s inside"""
         if obj is not None:
             key = obj.__class__.__name__ + '.' + obj.id
-            if key in self.__objects:
-                del self.__objects[key]
+            self.__discard(key)
+            self.__dirty.add(key)
+            self.__notify([key])
 
     def close(self):
-        """call reload() method for deserializing the JSON file to objects"""
+        """call reload() method for deserializing the JSON file to objects,
+        unless the file did not change since it was last read or written
+        or changes are still waiting to be written behind"""
+        if self.__reload_on_change and self.__stat() == self.__disk_state:
+            FileStorage.__skipped_reloads += 1
+            return
+        if self.__flush_window > 0 and self.__dirty:
+            FileStorage.__skipped_reloads += 1
+            return
         self.reload()
 
+    def metrics(self):
+        """returns counters describing the work done by the storage"""
+        loaded, seconds = self.__last_reload
+        return {"reloads": self.__reloads,
+                "skipped_reloads": self.__skipped_reloads,
+                "reload_objects": loaded,
+                "reload_objects_per_second":
+                    loaded / seconds if seconds else 0.0,
+                "flushes": self.__flushes,
+                "unloaded_shards": len(self.__unloaded),
+                "undecoded_objects": len(self.__mapped or ()) - sum(
+                    len(taken) for taken in self.__taken.values())}
+
     def get(self, cls, id):
         """
         Returns the object based on the class name and its ID, or
@@ -81,24 +773,144 @@ class FileStorage:
         if cls not in classes.values():
             return None
 
-        all_cls = models.storage.all(cls)
-        for value in all_cls.values():
-            if (value.id == id):
-                return value
+        return self.__materialize(cls.__name__ + "." + str(id))
+
+    def get_many(self, cls, ids):
+        """returns the objects of cls with the given ids that exist"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        objs = (self.__materialize(cls + "." + str(id)) for id in ids)
+        return [obj for obj in objs if obj is not None]
 
-        return None
+    def children(self, cls, foreign_key, parent_ids=None):
+        """returns lists of the objects of cls, ordered by id, keyed by the
+        value of their foreign_key attribute, for the given parent_ids or
+        for all"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        index = self.__children.setdefault(cls, {})
+        if foreign_key not in index:
+            self.__load_class(cls)
+            groups = {}
+            for obj in self.__buckets().get(cls, {}).values():
+                groups.setdefault(getattr(obj, foreign_key, None),
+                                  []).append(obj)
+            for group in groups.values():
+                group.sort(key=lambda obj: obj.id)
+            index[foreign_key] = groups
+        groups = index[foreign_key]
+        if parent_ids is None:
+            parent_ids = groups.keys()
+        return {parent_id: list(groups.get(parent_id, []))
+                for parent_id in parent_ids}
 
     def count(self, cls=None):
         """
         count the number of objects in storage
         """
-        all_class = classes.values()
-
         if not cls:
-            count = 0
-            for clas in all_class:
-                count += len(models.storage.all(clas).values())
-        else:
-            count = len(models.storage.all(cls).values())
+            return sum(self.counts().values())
+        if not isinstance(cls, str):
+            cls = cls.__name__
 
+        self.__load_shards(cls)
+        count = len(self.__buckets().get(cls, {}))
+        if self.__mapped is not None:
+            count += (self.__mapped.count(cls + ".") -
+                      len(self.__taken.get(cls, ())))
         return count
+
+    def counts(self):
+        """returns the number of objects of every class, by class name"""
+        return {name: self.count(name) for name in classes}
+
+    def __places_index(self):
+        """returns the ids of cities by state, places by city and places
+        by amenity, rebuilt after any city or place changed"""
+        if self.__search_index is None:
+            self.__load_class("City")
+            self.__load_class("Place")
+            buckets = self.__buckets()
+            cities_by_state, places_by_city, places_by_amenity = {}, {}, {}
+            for city in buckets.get("City", {}).values():
+                cities_by_state.setdefault(city.state_id, set()).add(city.id)
+            for place in buckets.get("Place", {}).values():
+                places_by_city.setdefault(place.city_id, set()).add(place.id)
+                for amenity_id in place.amenity_ids:
+                    places_by_amenity.setdefault(amenity_id,
+                                                 set()).add(place.id)
+            FileStorage.__search_index = (cities_by_state, places_by_city,
+                                          places_by_amenity)
+        return self.__search_index
+
+    def search_places(self, states=None, cities=None, amenities=None):
+        """returns the places, ordered by id, located in any of the given
+        states or cities (all places if none is given) that have all of
+        the given amenities"""
+        cities_by_state, places_by_city, places_by_amenity = \
+            self.__places_index()
+        ids = None
+        if states or cities:
+            city_ids = set(cities or [])
+            for state_id in states or []:
+                city_ids |= cities_by_state.get(state_id, set())
+            ids = set()
+            for city_id in city_ids:
+                ids |= places_by_city.get(city_id, set())
+        # intersect starting from the rarest amenity
+        amenities = sorted(amenities or [],
+                           key=lambda a: len(places_by_amenity.get(a, ())))
+        for amenity_id in amenities:
+            matching = places_by_amenity.get(amenity_id, set())
+            ids = set(matching) if ids is None else ids & matching
+
+        places = self.__buckets().get("Place", {})
+        if ids is None:
+            return sorted(places.values(), key=lambda place: place.id)
+        return [places["Place." + place_id] for place_id in sorted(ids)]
+
+    def page(self, cls, limit=None, after=None, **filters):
+        """returns up to limit objects of cls ordered by id, starting
+        after the id after, whose attributes equal the given filters"""
+        return list(self.stream(cls, limit, after, **filters))
+
+    def stream(self, cls, limit=None, after=None, **filters):
+        """yields the objects page() returns, one at a time; filtering on a
+        foreign key only goes through the objects sharing its value"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        foreign_key = next((attribute for attribute, value in filters.items()
+                            if attribute.endswith("_id") and
+                            isinstance(value, str)), None)
+        if foreign_key is not None:
+            parent_id = filters[foreign_key]
+            group = self.children(cls, foreign_key, [parent_id])[parent_id]
+            i = 0 if after is None else bisect.bisect_right(
+                group, after, key=lambda obj: obj.id)
+            count = 0
+            for obj in group[i:]:
+                if limit is not None and count >= limit:
+                    return
+                if all(getattr(obj, attribute, None) == value
+                       for attribute, value in filters.items()):
+                    count += 1
+                    yield obj
+            return
+        self.__load_shards(cls)
+        bucket = self.__buckets().get(cls, {})
+        if cls not in self.__sorted_ids:
+            keys = list(bucket) + list(self.__undecoded(cls))
+            self.__sorted_ids[cls] = sorted(key[len(cls) + 1:]
+                                            for key in keys)
+        ids = self.__sorted_ids[cls]
+
+        count = 0
+        i = 0 if after is None else bisect.bisect_right(ids, after)
+        while i < len(ids) and (limit is None or count < limit):
+            obj = self.__materialize(cls + "." + ids[i])
+            i += 1
+            if obj is None or any(getattr(obj, attribute, None) != value
+                                  for attribute, value in filters.items()):
+                continue
+            count += 1
+            yield obj
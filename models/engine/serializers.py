@@ -0,0 +1,336 @@
+#!/usr/bin/python3
+"""
+Snapshot formats of FileStorage, and a converter between them:
+
+    ./models/engine/serializers.py file.json file.records
+
+Every format stores (<class name>.id, dictionary) pairs. This module only
+depends on the standard library, so converting a snapshot does not load it
+into a storage first.
+"""
+
+import json
+import marshal
+import mmap
+import os
+import pickle
+import struct
+import sys
+
+
+class _JSONStream:
+    """reads JSON values one at a time from a file, chunk by chunk"""
+
+    def __init__(self, f, chunk_size=65536):
+        """wraps the file object f"""
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+
+    def fill(self):
+        """appends the next chunk of the file to the unread buffer"""
+        chunk = self.f.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not chunk:
+            raise ValueError("unexpected end of JSON document")
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+
+    def peek(self):
+        """returns the next non-whitespace character without consuming it"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            self.fill()
+
+    def expect(self, char):
+        """consumes char or raises ValueError"""
+        if self.peek() != char:
+            raise ValueError("expected {!r} in JSON document".format(char))
+        self.pos += 1
+
+    def value(self):
+        """decodes and consumes the next JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, self.pos = self.decoder.raw_decode(self.buf, self.pos)
+                return value
+            except ValueError:
+                self.fill()
+
+
+def _iter_json_object(f):
+    """yields the (key, value) pairs of the JSON object in f one at a
+    time, without building the whole document in memory"""
+    stream = _JSONStream(f)
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        key = stream.value()
+        stream.expect(":")
+        yield key, stream.value()
+        if stream.peek() == "}":
+            return
+        stream.expect(",")
+
+
+class JSONSerializer:
+    """a single JSON object mapping keys to dictionaries"""
+
+    binary = False
+    extension = "json"
+
+    def dump(self, items, f):
+        """writes the (key, dictionary) pairs of items to f"""
+        separator = "{"
+        for key, value in items:
+            f.write(separator + json.dumps(key) + ": " + json.dumps(value))
+            separator = ", "
+        f.write("{}" if separator == "{" else "}")
+
+    def load(self, f):
+        """yields the (key, dictionary) pairs stored in f"""
+        return _iter_json_object(f)
+
+
+class PickleSerializer:
+    """the key to dictionary mapping pickled with protocol 5; only load
+    files this storage wrote, as unpickling can run arbitrary code"""
+
+    binary = True
+    extension = "pickle"
+
+    def dump(self, items, f):
+        """writes the (key, dictionary) pairs of items to f"""
+        pickle.dump(dict(items), f, protocol=5)
+
+    def load(self, f):
+        """yields the (key, dictionary) pairs stored in f"""
+        return iter(pickle.load(f).items())
+
+
+class RecordSerializer:
+    """a header followed by length-prefixed frames, each a marshalled list
+    of up to BATCH (key, dictionary) pairs, so files are read and written
+    frame by frame"""
+
+    binary = True
+    extension = "records"
+    MAGIC = b"HBNBREC1"
+    BATCH = 1024
+    LENGTH = struct.Struct("<I")
+
+    def dump(self, items, f):
+        """writes the (key, dictionary) pairs of items to f"""
+        f.write(self.MAGIC)
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) == self.BATCH:
+                self.__write_frame(f, batch)
+                batch = []
+        if batch:
+            self.__write_frame(f, batch)
+
+    def __write_frame(self, f, batch):
+        """writes one frame holding the pairs of batch"""
+        payload = marshal.dumps(batch)
+        f.write(self.LENGTH.pack(len(payload)))
+        f.write(payload)
+
+    def load(self, f):
+        """yields the (key, dictionary) pairs stored in f"""
+        if f.read(len(self.MAGIC)) != self.MAGIC:
+            raise ValueError("not a record snapshot")
+        while True:
+            header = f.read(self.LENGTH.size)
+            if not header:
+                return
+            payload = f.read(self.LENGTH.unpack(header)[0])
+            yield from marshal.loads(payload)
+
+    def chunks(self, f, count):
+        """splits the frames of f into up to count (start, end) byte
+        ranges, reading only the frame headers"""
+        if f.read(len(self.MAGIC)) != self.MAGIC:
+            raise ValueError("not a record snapshot")
+        offsets = [len(self.MAGIC)]
+        while True:
+            header = f.read(self.LENGTH.size)
+            if not header:
+                break
+            offsets.append(offsets[-1] + self.LENGTH.size +
+                           self.LENGTH.unpack(header)[0])
+            f.seek(offsets[-1])
+        frames = len(offsets) - 1
+        per_chunk = max(1, -(-frames // count))
+        return [(offsets[i], offsets[min(i + per_chunk, frames)])
+                for i in range(0, frames, per_chunk)]
+
+    def load_chunk(self, f, chunk):
+        """yields the (key, dictionary) pairs of the frames in the byte
+        range chunk of f"""
+        start, end = chunk
+        f.seek(start)
+        while f.tell() < end:
+            header = f.read(self.LENGTH.size)
+            payload = f.read(self.LENGTH.unpack(header)[0])
+            yield from marshal.loads(payload)
+
+
+class MappedSnapshot:
+    """read-only view of an indexed snapshot mapped in memory; records are
+    decoded when accessed and keys are looked up by binary search in the
+    mapped index, so every process mapping the file shares its pages
+    instead of holding its own copy of the objects"""
+
+    def __init__(self, f):
+        """maps the indexed snapshot open as the binary file f"""
+        magic = IndexedSerializer.MAGIC
+        footer = IndexedSerializer.FOOTER
+        self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        end = len(self.mm) - footer.size
+        if end < len(magic) or self.mm[:len(magic)] != magic:
+            raise ValueError("not an indexed snapshot")
+        self.index_offset, self.size, tail = footer.unpack_from(self.mm, end)
+        if tail != magic:
+            raise ValueError("truncated indexed snapshot")
+
+    def __len__(self):
+        """returns the number of records"""
+        return self.size
+
+    def __entry(self, i):
+        """returns the (key, offset, length) of the i-th index entry"""
+        entry = IndexedSerializer.ENTRY
+        key_offset, key_length, offset, length = entry.unpack_from(
+            self.mm, self.index_offset + i * entry.size)
+        return self.mm[key_offset:key_offset + key_length], offset, length
+
+    def __bisect(self, key):
+        """returns the position of the first index entry not below key"""
+        key = key.encode()
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.__entry(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __find(self, key):
+        """returns the index entry of key, or None"""
+        i = self.__bisect(key)
+        if i < self.size:
+            entry = self.__entry(i)
+            if entry[0] == key.encode():
+                return entry
+        return None
+
+    def __contains__(self, key):
+        """tells whether a record is stored under key"""
+        return self.__find(key) is not None
+
+    def __getitem__(self, key):
+        """decodes the dictionary stored under key"""
+        entry = self.__find(key)
+        if entry is None:
+            raise KeyError(key)
+        return marshal.loads(self.mm[entry[1]:entry[1] + entry[2]])
+
+    def keys(self, prefix=""):
+        """yields the keys starting with prefix, in order"""
+        i = self.__bisect(prefix)
+        while i < self.size:
+            key = self.__entry(i)[0].decode()
+            if not key.startswith(prefix):
+                return
+            yield key
+            i += 1
+
+    def count(self, prefix=""):
+        """returns the number of keys starting with prefix"""
+        if not prefix:
+            return self.size
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return self.__bisect(upper) - self.__bisect(prefix)
+
+
+class IndexedSerializer:
+    """a marshalled record per object, then their keys, then a table of
+    the offsets and lengths of both sorted by key, for MappedSnapshot to
+    look records up in place"""
+
+    binary = True
+    extension = "indexed"
+    MAGIC = b"HBNBIDX1"
+    # offset and length of the key, then of its record
+    ENTRY = struct.Struct("<QIQI")
+    # offset of the table, number of entries, then MAGIC again
+    FOOTER = struct.Struct("<QQ8s")
+
+    def dump(self, items, f):
+        """writes the (key, dictionary) pairs of items to f"""
+        f.write(self.MAGIC)
+        offset = len(self.MAGIC)
+        index = []
+        for key, value in items:
+            record = marshal.dumps(value)
+            f.write(record)
+            index.append((key.encode(), offset, len(record)))
+            offset += len(record)
+        index.sort()
+        table = []
+        for key, record_offset, length in index:
+            f.write(key)
+            table.append(self.ENTRY.pack(offset, len(key), record_offset,
+                                         length))
+            offset += len(key)
+        f.write(b"".join(table))
+        f.write(self.FOOTER.pack(offset, len(index), self.MAGIC))
+
+    def load(self, f):
+        """yields the (key, dictionary) pairs stored in f"""
+        snapshot = MappedSnapshot(f)
+        for key in snapshot.keys():
+            yield key, snapshot[key]
+
+
+FORMATS = {"json": JSONSerializer(), "pickle": PickleSerializer(),
+           "records": RecordSerializer(), "indexed": IndexedSerializer()}
+
+
+def format_of(path):
+    """returns the name of the format matching the extension of path"""
+    extension = os.path.splitext(path)[1].lstrip(".")
+    for name, serializer in FORMATS.items():
+        if serializer.extension == extension:
+            return name
+    raise ValueError("unknown snapshot format: " + path)
+
+
+def convert(src, dst, src_format=None, dst_format=None):
+    """rewrites the snapshot src as dst, in the formats given or else
+    matching their extensions, one pair at a time"""
+    reader = FORMATS[src_format or format_of(src)]
+    writer = FORMATS[dst_format or format_of(dst)]
+    with open(src, 'rb' if reader.binary else 'r') as f_in:
+        tmp_path = dst + ".tmp"
+        with open(tmp_path, 'wb' if writer.binary else 'w') as f_out:
+            writer.dump(reader.load(f_in), f_out)
+            f_out.flush()
+            os.fsync(f_out.fileno())
+    os.replace(tmp_path, dst)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: {} SRC DST".format(sys.argv[0]), file=sys.stderr)
+        sys.exit(2)
+    convert(sys.argv[1], sys.argv[2])
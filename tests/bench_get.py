@@ -0,0 +1,47 @@
+#!/usr/bin/python3
+"""
+Times FileStorage.get() as the store grows ten times at each step, from
+1000 users to objects (1000000 by default):
+
+    ./tests/bench_get.py [objects] [lookups]
+
+Every step looks lookups ids up (10000 by default) spread over the whole
+store. The store lives in a temporary directory and is never saved.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main(objects=1000000, lookups=10000):
+    """grows the store and prints the mean get() latency at every size"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            sys.path.insert(0, ROOT)
+            from models import storage
+            from models.user import User
+
+            ids = []
+            size = 1000
+            while size <= objects:
+                ids.extend(User().id for _ in range(size - len(ids)))
+                picks = [ids[i * size // lookups] for i in range(lookups)]
+                started = time.perf_counter()
+                for obj_id in picks:
+                    storage.get(User, obj_id)
+                seconds = time.perf_counter() - started
+                print("{:>8} objects: {:6.2f} us per get()".format(
+                    size, seconds / lookups * 1e6))
+                size *= 10
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
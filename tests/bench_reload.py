@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+"""
+Times the reload of FileStorage run by `import models`, with 1 to N
+reload worker processes:
+
+    ./tests/bench_reload.py [objects] [max workers] [format] [shards]
+
+A snapshot of objects users (200000 by default) is written in format
+(records by default, split into shards per class when given) to a
+temporary directory, then every run imports models in a fresh process.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WRITE = """
+import models
+from models.user import User
+for i in range({objects}):
+    user = User()
+    user.email = "user{{}}@hbnb.io".format(i)
+    user.first_name = "Betty"
+models.storage.save()
+"""
+
+RELOAD = """
+import time
+started = time.perf_counter()
+import models
+print(time.perf_counter() - started, models.storage.count())
+"""
+
+
+def run(code, cwd, **env):
+    """runs code in a fresh interpreter and returns what it printed"""
+    env = dict(os.environ, PYTHONPATH=ROOT, **env)
+    return subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env,
+                          check=True, capture_output=True,
+                          text=True).stdout
+
+
+def main(objects=200000, max_workers=os.cpu_count(), format="records",
+         shards="0"):
+    """writes the snapshot and prints the reload time of every run"""
+    with tempfile.TemporaryDirectory() as cwd:
+        env = {"HBNB_FS_FORMAT": format, "HBNB_FS_SHARDS": shards}
+        run(WRITE.format(objects=objects), cwd, **env)
+        workers = 1
+        while True:
+            seconds, count = run(RELOAD, cwd, HBNB_FS_RELOAD_WORKERS=str(
+                workers), **env).split()
+            print("{:>3} workers: {:6.2f} s ({} objects)".format(
+                workers, float(seconds), count))
+            if workers >= max_workers:
+                break
+            workers = min(workers * 2, max_workers)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(*[int(arg) for arg in args[:2]], *args[2:])
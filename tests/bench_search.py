@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+"""
+Times FileStorage.search_places() against a scan of every place:
+
+    ./tests/bench_search.py [places] [amenities] [cities]
+
+places places (100000 by default) are spread over cities cities (1000)
+in 50 states, each with 5 of amenities amenities (50). Every query asks
+for the places of one state with two amenities. The store lives in a
+temporary directory and is never saved.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATES = 50
+QUERIES = 200
+
+
+def scan(storage, states, amenities):
+    """returns the ids of the matching places by walking all of them"""
+    cities = {city.id for city in storage.all("City").values()
+              if city.state_id in states}
+    wanted = set(amenities)
+    return sorted(place.id for place in storage.all("Place").values()
+                  if place.city_id in cities and
+                  wanted.issubset(place.amenity_ids))
+
+
+def timed(function, queries):
+    """returns the mean seconds function takes over the queries"""
+    started = time.perf_counter()
+    for query in queries:
+        function(*query)
+    return (time.perf_counter() - started) / len(queries)
+
+
+def main(places=100000, amenities=50, cities=1000):
+    """fills the store and prints the mean search times"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            sys.path.insert(0, ROOT)
+            from models import storage
+            from models.amenity import Amenity
+            from models.city import City
+            from models.place import Place
+            from models.state import State
+
+            rand = random.Random(0)
+            state_ids = [State().id for _ in range(STATES)]
+            city_ids = []
+            for i in range(cities):
+                city = City()
+                city.state_id = state_ids[i % STATES]
+                city_ids.append(city.id)
+            amenity_ids = [Amenity().id for _ in range(amenities)]
+            for i in range(places):
+                place = Place()
+                place.name = "P{}".format(i)
+                place.city_id = rand.choice(city_ids)
+                place.amenity_ids = rand.sample(amenity_ids, 5)
+            queries = [([rand.choice(state_ids)],
+                        rand.sample(amenity_ids, 2))
+                       for _ in range(QUERIES)]
+
+            def search(states, wanted):
+                """runs one indexed search"""
+                return [place.id for place in storage.search_places(
+                    states=states, amenities=wanted)]
+
+            def scanned(states, wanted):
+                """runs one full scan"""
+                return scan(storage, states, wanted)
+
+            assert search(*queries[0]) == scanned(*queries[0])
+            place.name = "changed"
+            rebuild = timed(search, queries[:1])
+            print("{} places, {} cities, {} amenities".format(
+                places, cities, amenities))
+            print("first search after a change: {:8.2f} ms".format(
+                rebuild * 1000))
+            print("indexed search:              {:8.2f} ms".format(
+                timed(search, queries) * 1000))
+            print("full scan:                   {:8.2f} ms".format(
+                timed(scanned, queries) * 1000))
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:4]])
@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+"""
+Times FileStorage.reload() with the timestamps parsed by strptime, as
+BaseModel used to, by fromisoformat, and left unparsed until first read
+(HBNB_LAZY_TIMESTAMPS=1):
+
+    ./tests/bench_timestamps.py [objects]
+
+A snapshot of objects users (100000 by default) is written to a
+temporary directory, then every run reloads it in a fresh process.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WRITE = """
+import models
+from models.user import User
+for i in range({objects}):
+    User()
+models.storage.save()
+"""
+
+# models is imported away from the snapshot, so that it can be patched
+# before the reload that is timed
+RELOAD = """
+import datetime, os, sys, time
+os.chdir(sys.argv[1])
+import models
+import models.base_model
+os.chdir(sys.argv[2])
+if sys.argv[3] == "strptime":
+    models.base_model.parse_datetime = lambda value: \\
+        datetime.datetime.strptime(value, models.base_model.TIME_FORMAT)
+started = time.perf_counter()
+models.storage.reload()
+print(time.perf_counter() - started, models.storage.count())
+"""
+
+RUNS = (("strptime", "strptime", {}),
+        ("fromisoformat", "fromisoformat", {}),
+        ("lazy timestamps", "fromisoformat", {"HBNB_LAZY_TIMESTAMPS": "1"}))
+
+
+def run(code, cwd, *args, **env):
+    """runs code in a fresh interpreter and returns what it printed"""
+    env = dict(os.environ, PYTHONPATH=ROOT, **env)
+    return subprocess.run([sys.executable, "-c", code] + list(args),
+                          cwd=cwd, env=env, check=True, capture_output=True,
+                          text=True).stdout
+
+
+def main(objects=100000):
+    """writes the snapshot and prints the reload time of every run"""
+    with tempfile.TemporaryDirectory() as cwd, \
+            tempfile.TemporaryDirectory() as empty:
+        run(WRITE.format(objects=objects), cwd)
+        for label, parse, env in RUNS:
+            seconds, count = run(RELOAD, cwd, empty, cwd, parse,
+                                 **env).split()
+            print("{:>15}: {:6.2f} s ({} objects)".format(
+                label, float(seconds), count))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -1,7 +1,10 @@
 """Defines unittests for BaseModel class"""
 
 import datetime
+import json
 import os
+import subprocess
+import sys
 import unittest
 import uuid
 from time import sleep
@@ -396,5 +399,94 @@ class TestBaseModelStr(unittest.TestCase):
         self.assertEqual(str(obj), result)
 
 
+class TestBaseModelTimestamps(unittest.TestCase):
+    """Unittests for timestamp parsing"""
+
+    def tearDown(self):
+        """Tear down test methods"""
+        models.base_model.LAZY_TIMESTAMPS = False
+
+    def test_parse_datetime_iso_format(self):
+        """test_parse_datetime_iso_format"""
+        specific_time = datetime.datetime(2017, 9, 28, 21, 7, 51, 973308)
+        self.assertEqual(specific_time, models.base_model.parse_datetime(
+            specific_time.isoformat()))
+
+    def test_parse_datetime_without_microseconds(self):
+        """test_parse_datetime_without_microseconds"""
+        specific_time = datetime.datetime(2017, 9, 28, 21, 7, 51)
+        self.assertEqual(specific_time, models.base_model.parse_datetime(
+            specific_time.isoformat()))
+
+    def test_lazy_timestamps(self):
+        """test_lazy_timestamps"""
+        models.base_model.LAZY_TIMESTAMPS = True
+        specific_time = datetime.datetime(2017, 9, 28, 21, 7, 51, 973308)
+        obj = BaseModel(id="1234", created_at=specific_time.isoformat(),
+                        updated_at=specific_time.isoformat())
+        self.assertIsInstance(obj.__dict__["created_at"], str)
+        self.assertEqual(specific_time.isoformat(),
+                         obj.to_dict()["created_at"])
+        self.assertEqual(specific_time, obj.created_at)
+        self.assertEqual(datetime.datetime, type(obj.__dict__["created_at"]))
+
+    def test_lazy_timestamps_with_datetime_kwargs(self):
+        """test_lazy_timestamps_with_datetime_kwargs"""
+        models.base_model.LAZY_TIMESTAMPS = True
+        with self.assertRaises(TypeError):
+            BaseModel(created_at=datetime.
+                      datetime(2017, 9, 28, 21, 7, 51, 973308))
+
+    def test_parse_datetime_matches_strptime(self):
+        """test_parse_datetime_matches_strptime"""
+        time_format = "%Y-%m-%dT%H:%M:%S.%f"
+        start = datetime.datetime(2017, 9, 28, 21, 7, 51, 973308)
+        for i in range(1000):
+            value = (start + datetime.timedelta(seconds=i * 3607.001)
+                     ).strftime(time_format)
+            self.assertEqual(
+                datetime.datetime.strptime(value, time_format),
+                models.base_model.parse_datetime(value))
+
+
+class TestBaseModelCompact(unittest.TestCase):
+    """Memory benchmark of the compact model layout"""
+
+    script = """if True:
+        import json
+        import tracemalloc
+        from models.engine.file_storage import classes
+        result = {}
+        for name, cls in classes.items():
+            obj = cls()
+            record = obj.to_dict()
+            for klass in cls.__mro__:
+                for field in klass.__dict__.get("__annotations__", {}):
+                    record.setdefault(field, getattr(obj, field))
+            tracemalloc.start()
+            objs = [cls(**record) for _ in range(1000)]
+            result[name] = tracemalloc.get_traced_memory()[0] / 1000
+            tracemalloc.stop()
+            assert objs[0].to_dict() == cls(**record).to_dict()
+        print(json.dumps(result))
+    """
+
+    def bytes_per_object(self, compact):
+        """measure bytes per object of every class in a new interpreter"""
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))))
+        env = dict(os.environ, HBNB_COMPACT_MODELS=compact)
+        output = subprocess.check_output([sys.executable, "-c", self.script],
+                                         cwd=root, env=env)
+        return json.loads(output)
+
+    def test_compact_layout_uses_less_memory(self):
+        """test_compact_layout_uses_less_memory"""
+        default = self.bytes_per_object("0")
+        compact = self.bytes_per_object("1")
+        for name in default:
+            self.assertLess(compact[name], default[name], name)
+
+
 if __name__ == '__main__':
     unittest.main()
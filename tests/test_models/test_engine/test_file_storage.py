@@ -1,7 +1,13 @@
 """Defines unittests for FileStorage class"""
 
 import os
+import subprocess
+import sys
+import threading
 import unittest
+import time
+from datetime import datetime
+from unittest.mock import patch
 
 
 from models.engine.file_storage import FileStorage
@@ -412,6 +418,1042 @@ class TestFileStorageReload(unittest.TestCase):
         key = "User." + obj.id
         self.assertIn(key, storage.all().keys())
 
+    def test_reload_many_objects(self):
+        """test_reload_many_objects"""
+        objs = [Place() for _ in range(200)]
+        objs[0].name = "{\"tricky\": [1, 2]}"
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(200, len(storage.all()))
+        self.assertEqual(objs[0].name,
+                         storage.all()["Place." + objs[0].id].name)
+        self.assertEqual(200, storage.metrics()["reload_objects"])
+        self.assertGreater(storage.metrics()["reload_objects_per_second"], 0)
+
+    def test_reload_malformed_file(self):
+        """test_reload_malformed_file"""
+        with open("file.json", "w", encoding="UTF-8") as file:
+            file.write('{"User.1": {"__class__": "User"')
+        storage.reload()
+        self.assertEqual({}, storage.all())
+
+
+class TestFileStorageJournal(unittest.TestCase):
+    """Unittests for journaled mode"""
+
+    @classmethod
+    def setUp(cls):
+        """Set up test methods"""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__journal = True
+        FileStorage._FileStorage__dirty = set()
+
+    @classmethod
+    def tearDown(cls):
+        """Tear down test methods"""
+        for path in ["file.json", "file.json.log"]:
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__journal = False
+        FileStorage._FileStorage__dirty = set()
+        FileStorage._FileStorage__objects = {}
+
+    def test_save_appends_only_changed_objects(self):
+        """test_save_appends_only_changed_objects"""
+        obj1 = User()
+        obj2 = State()
+        storage.save()
+        with open("file.json.log", "r", encoding="UTF-8") as file:
+            self.assertEqual(2, len(file.readlines()))
+        obj2.name = "Cairo"
+        storage.save()
+        with open("file.json.log", "r", encoding="UTF-8") as file:
+            lines = file.readlines()
+        self.assertEqual(3, len(lines))
+        self.assertIn("State." + obj2.id, lines[-1])
+        self.assertNotIn("User." + obj1.id, lines[-1])
+        self.assertFalse(os.path.exists("file.json"))
+
+    def test_reload_replays_journal(self):
+        """test_reload_replays_journal"""
+        obj1 = Place()
+        obj2 = Review()
+        storage.save()
+        obj1.name = "Nile view"
+        storage.delete(obj2)
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual("Nile view",
+                         storage.all()["Place." + obj1.id].name)
+        self.assertNotIn("Review." + obj2.id, storage.all())
+
+    def test_reload_ignores_torn_record(self):
+        """test_reload_ignores_torn_record"""
+        obj = City()
+        storage.save()
+        with open("file.json.log", "a", encoding="UTF-8") as file:
+            file.write('{"op": "put", "key": "City.1", "obj": {')
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(["City." + obj.id], list(storage.all().keys()))
+        self.assertFalse(os.path.exists("file.json.log"))
+
+    def test_compact_writes_snapshot(self):
+        """test_compact_writes_snapshot"""
+        obj = Amenity()
+        storage.save()
+        storage.compact()
+        self.assertFalse(os.path.exists("file.json.log"))
+        with open("file.json", "r", encoding="UTF-8") as file:
+            self.assertIn("Amenity." + obj.id, file.read())
+
+
+class TestFileStorageCount(unittest.TestCase):
+    """Unittests for all(cls) and count methods"""
+
+    @classmethod
+    def setUp(cls):
+        """Set up test methods"""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(cls):
+        """Tear down test methods"""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_all_with_class(self):
+        """test_all_with_class"""
+        obj1 = State()
+        obj2 = State()
+        User()
+        expected = {"State." + obj1.id: obj1, "State." + obj2.id: obj2}
+        self.assertEqual(expected, storage.all(State))
+        self.assertEqual(expected, storage.all("State"))
+
+    def test_all_with_class_after_delete(self):
+        """test_all_with_class_after_delete"""
+        obj1 = Review()
+        obj2 = Review()
+        storage.delete(obj1)
+        self.assertEqual({"Review." + obj2.id: obj2}, storage.all(Review))
+
+    def test_count(self):
+        """test_count"""
+        City()
+        City()
+        Amenity()
+        self.assertEqual(2, storage.count(City))
+        self.assertEqual(1, storage.count("Amenity"))
+        self.assertEqual(0, storage.count(Place))
+        self.assertEqual(3, storage.count())
+
+    def test_counts(self):
+        """test_counts"""
+        State()
+        Review()
+        Review()
+        counts = storage.counts()
+        self.assertEqual(1, counts["State"])
+        self.assertEqual(2, counts["Review"])
+        self.assertEqual(0, counts["User"])
+
+    def test_count_after_objects_replaced(self):
+        """test_count_after_objects_replaced"""
+        User()
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual(0, storage.count(User))
+        self.assertEqual({}, storage.all(User))
+
+
+class TestFileStorageGet(unittest.TestCase):
+    """Unittests for get method"""
+
+    @classmethod
+    def setUp(cls):
+        """Set up test methods"""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+
+    @classmethod
+    def tearDown(cls):
+        """Tear down test methods"""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_get_existing_object(self):
+        """test_get_existing_object"""
+        obj = Place()
+        self.assertIs(obj, storage.get(Place, obj.id))
+
+    def test_get_with_wrong_class(self):
+        """test_get_with_wrong_class"""
+        obj = Place()
+        self.assertIsNone(storage.get(City, obj.id))
+
+    def test_get_missing_id(self):
+        """test_get_missing_id"""
+        self.assertIsNone(storage.get(User, "1234"))
+
+    def test_get_with_unknown_class(self):
+        """test_get_with_unknown_class"""
+        obj = User()
+        self.assertIsNone(storage.get(str, obj.id))
+
+
+class TestFileStorageChildren(unittest.TestCase):
+    """Unittests for children and get_many methods"""
+
+    @classmethod
+    def setUp(cls):
+        """Set up test methods"""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(cls):
+        """Tear down test methods"""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_children_grouped_by_parent(self):
+        """test_children_grouped_by_parent"""
+        ca, ny = State(), State()
+        sf, la, nyc = City(), City(), City()
+        sf.state_id = la.state_id = ca.id
+        nyc.state_id = ny.id
+        cities = storage.children(City, "state_id")
+        self.assertCountEqual([sf, la], cities[ca.id])
+        self.assertEqual([nyc], cities[ny.id])
+
+    def test_children_for_parent_ids(self):
+        """test_children_for_parent_ids"""
+        ca = State()
+        sf = City()
+        sf.state_id = ca.id
+        cities = storage.children("City", "state_id", [ca.id, "missing"])
+        self.assertEqual({ca.id: [sf], "missing": []}, cities)
+
+    def test_children_follow_changes(self):
+        """test_children_follow_changes"""
+        ca, ny = State(), State()
+        sf = City()
+        sf.state_id = ca.id
+        self.assertEqual([sf], storage.children(City, "state_id")[ca.id])
+        sf.state_id = ny.id
+        cities = storage.children(City, "state_id", [ca.id, ny.id])
+        self.assertEqual({ca.id: [], ny.id: [sf]}, cities)
+        storage.delete(sf)
+        self.assertEqual([], storage.children(City, "state_id",
+                                              [ny.id])[ny.id])
+
+    def test_get_many(self):
+        """test_get_many"""
+        wifi, pool = Amenity(), Amenity()
+        self.assertEqual([pool, wifi],
+                         storage.get_many(Amenity,
+                                          [pool.id, "missing", wifi.id]))
+        self.assertEqual([], storage.get_many(City, [wifi.id]))
+
+
+class TestFileStorageGeneration(unittest.TestCase):
+    """Unittests for generation method"""
+
+    @classmethod
+    def setUp(cls):
+        """Set up test methods"""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(cls):
+        """Tear down test methods"""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_generation_is_stable_without_changes(self):
+        """test_generation_is_stable_without_changes"""
+        State()
+        self.assertEqual(storage.generation(State),
+                         storage.generation(State))
+        self.assertEqual(storage.generation(), storage.generation())
+
+    def test_generation_changes_on_new_update_delete(self):
+        """test_generation_changes_on_new_update_delete"""
+        seen = {storage.generation(State)}
+        state = State()
+        seen.add(storage.generation(State))
+        state.name = "California"
+        seen.add(storage.generation(State))
+        storage.delete(state)
+        seen.add(storage.generation(State))
+        self.assertEqual(4, len(seen))
+
+    def test_generation_is_per_class(self):
+        """test_generation_is_per_class"""
+        State()
+        before = storage.generation("State")
+        everything = storage.generation()
+        City()
+        self.assertEqual(before, storage.generation("State"))
+        self.assertNotEqual(everything, storage.generation())
+
+    def test_generation_changes_on_reload(self):
+        """test_generation_changes_on_reload"""
+        State().save()
+        before = storage.generation(State)
+        FileStorage._FileStorage__objects = {}
+        self.assertNotEqual(before, storage.generation(State))
+        storage.reload()
+        self.assertNotEqual(before, storage.generation(State))
+
+
+class TestFileStorageSubscribe(unittest.TestCase):
+    """Unittests for subscribe method"""
+
+    @classmethod
+    def setUp(cls):
+        """Set up test methods"""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__dirty = set()
+
+    @classmethod
+    def tearDown(cls):
+        """Tear down test methods"""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__listeners = []
+
+    def test_listener_told_new_save_delete(self):
+        """test_listener_told_new_save_delete"""
+        events = []
+        storage.subscribe(events.append)
+        state = State()
+        key = "State." + state.id
+        self.assertEqual([[key]], events)
+        state.name = "California"
+        self.assertEqual([[key]], events)
+        state.save()
+        self.assertEqual([[key], [key]], events)
+        storage.delete(state)
+        self.assertEqual([[key], [key], [key]], events)
+
+    def test_listener_told_reload(self):
+        """test_listener_told_reload"""
+        events = []
+        storage.subscribe(events.append)
+        storage.reload()
+        self.assertEqual([None], events)
+
+
+class TestFileStorageClose(unittest.TestCase):
+    """Unittests for close method"""
+
+    @classmethod
+    def setUp(cls):
+        """Set up test methods"""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+
+    @classmethod
+    def tearDown(cls):
+        """Tear down test methods"""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_close_skips_reload_when_unchanged(self):
+        """test_close_skips_reload_when_unchanged"""
+        obj = State()
+        storage.save()
+        before = storage.metrics()
+        storage.close()
+        after = storage.metrics()
+        self.assertEqual(before["reloads"], after["reloads"])
+        self.assertEqual(before["skipped_reloads"] + 1,
+                         after["skipped_reloads"])
+        self.assertIs(obj, storage.all()["State." + obj.id])
+
+    def test_close_reloads_when_file_changed(self):
+        """test_close_reloads_when_file_changed"""
+        obj = State()
+        storage.save()
+        with open("file.json", "r", encoding="UTF-8") as file:
+            content = file.read().replace('"__class__"', '"name": "Giza", '
+                                          '"__class__"')
+        os.remove("file.json")
+        with open("file.json", "w", encoding="UTF-8") as file:
+            file.write(content)
+        before = storage.metrics()
+        storage.close()
+        self.assertEqual(before["reloads"] + 1, storage.metrics()["reloads"])
+        self.assertEqual("Giza", storage.all()["State." + obj.id].name)
+
+
+class TestFileStorageLazy(unittest.TestCase):
+    """Unittests for lazy reload mode"""
+
+    @classmethod
+    def setUp(cls):
+        """Set up test methods"""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__lazy = True
+
+    @classmethod
+    def tearDown(cls):
+        """Tear down test methods"""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__lazy = False
+        FileStorage._FileStorage__objects = {}
+
+    def test_reload_adopts_stored_dict(self):
+        """test_reload_adopts_stored_dict"""
+        obj = Place()
+        obj.name = "Lazy house"
+        obj.number_rooms = 3
+        obj.save()
+        expected = obj.to_dict()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        loaded = storage.get(Place, obj.id)
+        self.assertEqual(Place, type(loaded))
+        self.assertIsInstance(loaded.__dict__["updated_at"], str)
+        self.assertEqual(expected, loaded.to_dict())
+        self.assertEqual(obj.updated_at, loaded.updated_at)
+        self.assertEqual("Lazy house", loaded.name)
+
+    def test_reads_leave_storage_clean(self):
+        """test_reads_leave_storage_clean"""
+        FileStorage._FileStorage__shards = 1
+        try:
+            users = [User() for _ in range(3)]
+            storage.save()
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            generation = storage.generation(User)
+            self.assertEqual(users[0].id, storage.get(User, users[0].id).id)
+            self.assertEqual(3, len(storage.all(User)))
+            self.assertEqual(set(), FileStorage._FileStorage__dirty)
+            self.assertEqual(generation, storage.generation(User))
+            os.remove("file.User.json")
+            State().save()
+            self.assertFalse(os.path.exists("file.User.json"))
+        finally:
+            FileStorage._FileStorage__shards = 0
+            for name in ("file.User.json", "file.State.json"):
+                try:
+                    os.remove(name)
+                except IOError:
+                    pass
+
+
+class TestFileStorageDirty(unittest.TestCase):
+    """Unittests for dirty tracking and update method"""
+
+    @classmethod
+    def setUp(cls):
+        """Set up test methods"""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__dirty = set()
+
+    @classmethod
+    def tearDown(cls):
+        """Tear down test methods"""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_save_without_changes_skips_write(self):
+        """test_save_without_changes_skips_write"""
+        User()
+        storage.save()
+        os.remove("file.json")
+        storage.save()
+        self.assertFalse(os.path.exists("file.json"))
+
+    def test_setting_attribute_marks_dirty(self):
+        """test_setting_attribute_marks_dirty"""
+        obj = User()
+        storage.save()
+        obj.first_name = "Youssef"
+        self.assertIn("User." + obj.id, FileStorage._FileStorage__dirty)
+        storage.save()
+        self.assertEqual(set(), FileStorage._FileStorage__dirty)
+        with open("file.json", "r", encoding="UTF-8") as file:
+            self.assertIn("Youssef", file.read())
+
+    def test_save_serializes_only_changed_objects(self):
+        """test_save_serializes_only_changed_objects"""
+        users = [User() for _ in range(5)]
+        storage.save()
+        users[0].first_name = "Youssef"
+        with patch.object(User, "to_dict", autospec=True,
+                          side_effect=BaseModel.to_dict) as to_dict:
+            storage.save()
+        to_dict.assert_called_once_with(users[0])
+        storage.reload()
+        self.assertEqual("Youssef", storage.get(User, users[0].id).first_name)
+        self.assertEqual(5, storage.count(User))
+
+    def test_delete_marks_dirty(self):
+        """test_delete_marks_dirty"""
+        obj = State()
+        storage.save()
+        storage.delete(obj)
+        storage.save()
+        with open("file.json", "r", encoding="UTF-8") as file:
+            self.assertNotIn("State." + obj.id, file.read())
+
+    def test_reload_is_clean(self):
+        """test_reload_is_clean"""
+        City()
+        storage.save()
+        storage.reload()
+        self.assertEqual(set(), FileStorage._FileStorage__dirty)
+
+    def test_update_casts_to_attribute_type(self):
+        """test_update_casts_to_attribute_type"""
+        obj = Place()
+        key = "Place." + obj.id
+        storage.update(key, "number_rooms", "4")
+        storage.update(key, "latitude", "30.5")
+        storage.update(key, "name", '"Nile view"')
+        self.assertEqual(4, obj.number_rooms)
+        self.assertEqual(30.5, obj.latitude)
+        self.assertEqual("Nile view", obj.name)
+
+
+class TestFileStorageWriteBehind(unittest.TestCase):
+    """Unittests for write-behind saves and flush method"""
+
+    @classmethod
+    def setUp(cls):
+        """Set up test methods"""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__dirty = set()
+        FileStorage._FileStorage__flush_window = 0.05
+
+    @classmethod
+    def tearDown(cls):
+        """Tear down test methods"""
+        storage.flush()
+        FileStorage._FileStorage__flush_window = 0
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_save_returns_before_writing(self):
+        """test_save_returns_before_writing"""
+        FileStorage._FileStorage__flush_window = 1
+        User().save()
+        self.assertFalse(os.path.exists("file.json"))
+
+    def test_flush_writes_pending_saves(self):
+        """test_flush_writes_pending_saves"""
+        obj = User()
+        obj.save()
+        storage.flush()
+        with open("file.json", "r", encoding="UTF-8") as file:
+            self.assertIn("User." + obj.id, file.read())
+
+    def test_saves_in_window_are_coalesced(self):
+        """test_saves_in_window_are_coalesced"""
+        flushes = storage.metrics()["flushes"]
+        objs = [State() for _ in range(20)]
+        for obj in objs:
+            obj.save()
+        storage.flush()
+        self.assertLessEqual(storage.metrics()["flushes"] - flushes, 2)
+        with open("file.json", "r", encoding="UTF-8") as file:
+            text = file.read()
+        for obj in objs:
+            self.assertIn("State." + obj.id, text)
+
+    def test_background_writer_flushes(self):
+        """test_background_writer_flushes"""
+        obj = City()
+        obj.save()
+        text = ""
+        for _ in range(100):
+            time.sleep(0.01)
+            if os.path.exists("file.json"):
+                with open("file.json", "r", encoding="UTF-8") as file:
+                    text = file.read()
+                break
+        self.assertIn("City." + obj.id, text)
+
+    def test_save_does_not_wait_for_a_write(self):
+        """test_save_does_not_wait_for_a_write"""
+        User().save()
+        writing = threading.Event()
+
+        def write():
+            """holds the storage lock like a slow write would"""
+            with FileStorage._FileStorage__lock:
+                writing.set()
+                time.sleep(0.5)
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        writing.wait()
+        started = time.perf_counter()
+        State().save()
+        elapsed = time.perf_counter() - started
+        writer.join()
+        self.assertLess(elapsed, 0.25)
+
+
+class TestFileStorageShards(unittest.TestCase):
+    """Unittests for snapshots split into one file per class"""
+
+    @classmethod
+    def setUp(cls):
+        """Set up test methods"""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__shards = 1
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(cls):
+        """Tear down test methods"""
+        FileStorage._FileStorage__shards = 0
+        FileStorage._FileStorage__journal = False
+        for name in os.listdir("."):
+            if name.startswith("file.") and name != "file.json":
+                os.remove(name)
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_save_writes_a_file_per_class(self):
+        """test_save_writes_a_file_per_class"""
+        User().save()
+        State().save()
+        self.assertTrue(os.path.exists("file.User.json"))
+        self.assertTrue(os.path.exists("file.State.json"))
+        self.assertFalse(os.path.exists("file.json"))
+
+    def test_save_rewrites_only_dirty_shards(self):
+        """test_save_rewrites_only_dirty_shards"""
+        User().save()
+        before = os.stat("file.User.json").st_ino
+        Review().save()
+        self.assertEqual(before, os.stat("file.User.json").st_ino)
+        self.assertTrue(os.path.exists("file.Review.json"))
+
+    def test_reload_reads_shards_on_demand(self):
+        """test_reload_reads_shards_on_demand"""
+        user = User()
+        state = State()
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(2, storage.metrics()["unloaded_shards"])
+        self.assertEqual(user.to_dict(),
+                         storage.get(User, user.id).to_dict())
+        self.assertEqual(1, storage.metrics()["unloaded_shards"])
+        self.assertIn("State." + state.id, storage.all())
+        self.assertEqual(0, storage.metrics()["unloaded_shards"])
+
+    def test_delete_rewrites_shard(self):
+        """test_delete_rewrites_shard"""
+        users = [User(), User()]
+        storage.save()
+        storage.delete(users[0])
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual([users[1].id], [u.id for u in storage.page(User)])
+
+    def test_unsaved_changes_survive_shard_load(self):
+        """test_unsaved_changes_survive_shard_load"""
+        user = User()
+        storage.save()
+        storage.reload()
+        user = storage.all(User)["User." + user.id]
+        storage.reload()
+        user.first_name = "Betty"
+        storage.new(user)
+        self.assertEqual("Betty", storage.get(User, user.id).first_name)
+
+    def test_hash_buckets(self):
+        """test_hash_buckets"""
+        FileStorage._FileStorage__shards = 4
+        users = [User() for _ in range(20)]
+        storage.save()
+        shards = [name for name in os.listdir(".")
+                  if name.startswith("file.User.")]
+        self.assertGreater(len(shards), 1)
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(sorted(u.id for u in users),
+                         [u.id for u in storage.page(User)])
+
+    def test_journal_replays_over_shards(self):
+        """test_journal_replays_over_shards"""
+        user = User()
+        storage.save()
+        FileStorage._FileStorage__journal = True
+        user.first_name = "Betty"
+        user.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual("Betty", storage.get(User, user.id).first_name)
+
+
+class TestFileStorageParallelReload(unittest.TestCase):
+    """Unittests for reloads building objects on worker processes"""
+
+    @classmethod
+    def setUp(cls):
+        """Set up test methods"""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__reload_workers = 2
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(cls):
+        """Tear down test methods"""
+        FileStorage._FileStorage__reload_workers = 0
+        FileStorage._FileStorage__format = "json"
+        FileStorage._FileStorage__shards = 0
+        FileStorage._FileStorage__lazy = False
+        for name in os.listdir("."):
+            if name.startswith("file.") and name != "file.json":
+                os.remove(name)
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def save_and_reload(self):
+        """saves users spanning several chunks and reloads them into an
+        empty storage, returning their dictionaries"""
+        users = [User() for _ in range(2500)]
+        users[0].first_name = "Betty"
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(set(), FileStorage._FileStorage__dirty)
+        self.assertEqual(2500, storage.metrics()["reload_objects"])
+        return {user.id: user.to_dict() for user in users}
+
+    def test_records_snapshot(self):
+        """test_records_snapshot"""
+        FileStorage._FileStorage__format = "records"
+        expected = self.save_and_reload()
+        self.assertEqual(expected, {user.id: user.to_dict()
+                                    for user in storage.all(User).values()})
+
+    def test_timestamps_are_parsed(self):
+        """test_timestamps_are_parsed"""
+        FileStorage._FileStorage__format = "records"
+        self.save_and_reload()
+        for user in storage.all(User).values():
+            self.assertIs(type(user.__dict__["created_at"]), datetime)
+
+    def test_reload_while_importing_models(self):
+        """test_reload_while_importing_models"""
+        FileStorage._FileStorage__format = "records"
+        self.save_and_reload()
+        env = dict(os.environ, HBNB_FS_FORMAT="records",
+                   HBNB_FS_RELOAD_WORKERS="2")
+        output = subprocess.run(
+            [sys.executable, "-c",
+             "import models; print(models.storage.count())"],
+            env=env, capture_output=True, text=True, timeout=60).stdout
+        self.assertEqual("2500", output.strip())
+
+    def test_lazy_objects(self):
+        """test_lazy_objects"""
+        FileStorage._FileStorage__format = "records"
+        FileStorage._FileStorage__lazy = True
+        expected = self.save_and_reload()
+        self.assertEqual(expected, {user.id: user.to_dict()
+                                    for user in storage.all(User).values()})
+
+    def test_shards(self):
+        """test_shards"""
+        FileStorage._FileStorage__shards = 4
+        expected = self.save_and_reload()
+        self.assertEqual(0, storage.metrics()["unloaded_shards"])
+        self.assertEqual(expected, {user.id: user.to_dict()
+                                    for user in storage.all(User).values()})
+
+
+class TestFileStorageSearchPlaces(unittest.TestCase):
+    """Unittests for search_places method"""
+
+    @classmethod
+    def setUp(cls):
+        """Set up test methods"""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(cls):
+        """Tear down test methods"""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def create_place(self, city, amenities=()):
+        """create a place in city with the given amenities"""
+        place = Place()
+        place.city_id = city.id
+        place.amenity_ids = [amenity.id for amenity in amenities]
+        return place
+
+    def setUpPlaces(self):
+        """create two states, three cities and four places"""
+        self.state1, self.state2 = State(), State()
+        self.city1, self.city2, self.city3 = City(), City(), City()
+        self.city1.state_id = self.state1.id
+        self.city2.state_id = self.state1.id
+        self.city3.state_id = self.state2.id
+        self.wifi, self.pool = Amenity(), Amenity()
+        self.place1 = self.create_place(self.city1, [self.wifi])
+        self.place2 = self.create_place(self.city2, [self.wifi, self.pool])
+        self.place3 = self.create_place(self.city3, [self.pool])
+        self.place4 = self.create_place(self.city3)
+
+    def ids(self, places):
+        """ids of places as a set"""
+        return {place.id for place in places}
+
+    def test_search_without_filters(self):
+        """test_search_without_filters"""
+        self.setUpPlaces()
+        places = storage.search_places()
+        self.assertEqual(4, len(places))
+        self.assertEqual(sorted(place.id for place in places),
+                         [place.id for place in places])
+
+    def test_search_by_state_and_city(self):
+        """test_search_by_state_and_city"""
+        self.setUpPlaces()
+        places = storage.search_places([self.state1.id], [self.city3.id])
+        self.assertEqual(4, len(places))
+        places = storage.search_places([self.state1.id])
+        self.assertEqual(self.ids([self.place1, self.place2]),
+                         self.ids(places))
+
+    def test_search_by_amenities(self):
+        """test_search_by_amenities"""
+        self.setUpPlaces()
+        places = storage.search_places(amenities=[self.wifi.id, self.pool.id])
+        self.assertEqual([self.place2], places)
+        places = storage.search_places([self.state2.id], [],
+                                       [self.pool.id])
+        self.assertEqual([self.place3], places)
+
+    def test_search_after_place_changed(self):
+        """test_search_after_place_changed"""
+        self.setUpPlaces()
+        self.assertEqual(2, len(storage.search_places([self.state2.id])))
+        self.place4.city_id = self.city1.id
+        self.assertEqual(1, len(storage.search_places([self.state2.id])))
+        storage.delete(self.place3)
+        self.assertEqual([], storage.search_places([self.state2.id]))
+
+
+class TestFileStoragePage(unittest.TestCase):
+    """Unittests for page method"""
+
+    @classmethod
+    def setUp(cls):
+        """Set up test methods"""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(cls):
+        """Tear down test methods"""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_page_orders_by_id(self):
+        """test_page_orders_by_id"""
+        ids = sorted(State().id for _ in range(5))
+        User()
+        self.assertEqual(ids, [obj.id for obj in storage.page(State)])
+
+    def test_page_with_limit_and_after(self):
+        """test_page_with_limit_and_after"""
+        ids = sorted(State().id for _ in range(5))
+        first = storage.page(State, 2)
+        self.assertEqual(ids[:2], [obj.id for obj in first])
+        second = storage.page(State, 2, first[-1].id)
+        self.assertEqual(ids[2:4], [obj.id for obj in second])
+        self.assertEqual([], storage.page(State, 2, ids[-1]))
+
+    def test_page_after_new_and_delete(self):
+        """test_page_after_new_and_delete"""
+        objs = [Amenity() for _ in range(3)]
+        storage.page(Amenity)
+        storage.delete(objs[0])
+        new_obj = Amenity()
+        expected = sorted([objs[1].id, objs[2].id, new_obj.id])
+        self.assertEqual(expected, [obj.id for obj in storage.page(Amenity)])
+
+    def test_stream_yields_objects_lazily(self):
+        """test_stream_yields_objects_lazily"""
+        ids = sorted(City().id for _ in range(3))
+        objs = storage.stream(City, after=ids[0])
+        self.assertEqual(ids[1], next(objs).id)
+        self.assertEqual([ids[2]], [obj.id for obj in objs])
+
+    def test_page_with_filters(self):
+        """test_page_with_filters"""
+        place = Place()
+        reviews = [Review() for _ in range(4)]
+        for review in reviews[:3]:
+            review.place_id = place.id
+        expected = sorted(review.id for review in reviews[:3])
+        self.assertEqual(expected[:2], [obj.id for obj in storage.page(
+            Review, 2, place_id=place.id)])
+
+    def test_page_by_foreign_key_after_and_moves(self):
+        """test_page_by_foreign_key_after_and_moves"""
+        places = [Place() for _ in range(5)]
+        for place in places:
+            place.city_id = "paris"
+        ids = sorted(place.id for place in places)
+        self.assertEqual(ids[2:4], [obj.id for obj in storage.page(
+            Place, 2, ids[1], city_id="paris")])
+        moved = storage.get(Place, ids[0])
+        moved.city_id = "lyon"
+        self.assertEqual(ids[1:], [obj.id for obj in storage.page(
+            Place, city_id="paris")])
+        self.assertEqual([ids[0]], [obj.id for obj in storage.page(
+            Place, city_id="lyon", name="")])
+
 
 if __name__ == '__main__':
     unittest.main()
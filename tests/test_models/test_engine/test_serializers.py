@@ -0,0 +1,284 @@
+"""Defines unittests for the FileStorage snapshot formats"""
+
+import json
+import os
+import unittest
+
+from models.engine.file_storage import FileStorage
+from models.engine.serializers import FORMATS, MappedSnapshot, convert, \
+    format_of
+from models import storage
+from models.place import Place
+from models.user import User
+
+
+ITEMS = [("User.1", {"id": "1", "__class__": "User", "email": "a@b.c"}),
+         ("Place.2", {"id": "2", "__class__": "Place", "number_rooms": 3,
+                      "latitude": 1.5, "amenity_ids": ["x", "y"]})]
+
+
+class TestSerializers(unittest.TestCase):
+    """Unittests for the serializers"""
+
+    def tearDown(self):
+        """Tear down test methods"""
+        for name in ("snapshot", "copy.json", "copy.records", "copy.pickle"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+
+    def round_trip(self, serializer, items):
+        """dumps items with serializer and loads them back"""
+        with open("snapshot", 'wb' if serializer.binary else 'w') as f:
+            serializer.dump(iter(items), f)
+        with open("snapshot", 'rb' if serializer.binary else 'r') as f:
+            return list(serializer.load(f))
+
+    def test_round_trip_every_format(self):
+        """test_round_trip_every_format"""
+        for name, serializer in FORMATS.items():
+            with self.subTest(format=name):
+                self.assertCountEqual(ITEMS,
+                                      self.round_trip(serializer, ITEMS))
+
+    def test_round_trip_empty(self):
+        """test_round_trip_empty"""
+        for name, serializer in FORMATS.items():
+            with self.subTest(format=name):
+                self.assertEqual([], self.round_trip(serializer, []))
+
+    def test_records_span_several_frames(self):
+        """test_records_span_several_frames"""
+        serializer = FORMATS["records"]
+        items = [("User.{}".format(i), {"id": str(i)})
+                 for i in range(serializer.BATCH * 2 + 1)]
+        self.assertEqual(items, self.round_trip(serializer, items))
+
+    def test_records_chunks_cover_every_frame(self):
+        """test_records_chunks_cover_every_frame"""
+        serializer = FORMATS["records"]
+        items = [("User.{}".format(i), {"id": str(i)})
+                 for i in range(serializer.BATCH * 5 + 1)]
+        self.round_trip(serializer, items)
+        with open("snapshot", "rb") as f:
+            chunks = serializer.chunks(f, 4)
+            self.assertEqual(3, len(chunks))
+            loaded = []
+            for chunk in chunks:
+                loaded.extend(serializer.load_chunk(f, chunk))
+        self.assertEqual(items, loaded)
+
+    def test_json_format_is_plain_json(self):
+        """test_json_format_is_plain_json"""
+        self.round_trip(FORMATS["json"], ITEMS)
+        with open("snapshot", "r") as f:
+            self.assertEqual(dict(ITEMS), json.load(f))
+
+    def test_format_of(self):
+        """test_format_of"""
+        self.assertEqual("json", format_of("file.json"))
+        self.assertEqual("records", format_of("dir/file.records"))
+        with self.assertRaises(ValueError):
+            format_of("file.txt")
+
+    def test_mapped_snapshot_decodes_by_key(self):
+        """test_mapped_snapshot_decodes_by_key"""
+        self.round_trip(FORMATS["indexed"], ITEMS)
+        with open("snapshot", "rb") as f:
+            snapshot = MappedSnapshot(f)
+        self.assertEqual(2, len(snapshot))
+        self.assertIn("Place.2", snapshot)
+        self.assertNotIn("Place.1", snapshot)
+        self.assertEqual(dict(ITEMS)["Place.2"], snapshot["Place.2"])
+
+    def test_mapped_snapshot_long_keys(self):
+        """test_mapped_snapshot_long_keys"""
+        items = [("User." + "x" * 200, {"id": "x" * 200}), ("User.1", {})]
+        self.round_trip(FORMATS["indexed"], items)
+        with open("snapshot", "rb") as f:
+            snapshot = MappedSnapshot(f)
+        self.assertEqual(items[0][1], snapshot["User." + "x" * 200])
+        self.assertEqual(2, snapshot.count("User."))
+
+    def test_mapped_snapshot_rejects_other_files(self):
+        """test_mapped_snapshot_rejects_other_files"""
+        self.round_trip(FORMATS["records"], ITEMS)
+        with open("snapshot", "rb") as f:
+            with self.assertRaises(ValueError):
+                MappedSnapshot(f)
+
+    def test_convert_between_formats(self):
+        """test_convert_between_formats"""
+        with open("copy.json", "w") as f:
+            FORMATS["json"].dump(iter(ITEMS), f)
+        convert("copy.json", "copy.records")
+        convert("copy.records", "copy.pickle")
+        with open("copy.pickle", "rb") as f:
+            self.assertEqual(ITEMS, list(FORMATS["pickle"].load(f)))
+
+
+class TestFileStorageFormats(unittest.TestCase):
+    """Unittests for FileStorage with each snapshot format"""
+
+    @classmethod
+    def setUp(cls):
+        """Set up test methods"""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(cls):
+        """Tear down test methods"""
+        FileStorage._FileStorage__format = "json"
+        for name in ("file.json", "file.pickle", "file.records",
+                     "file.indexed"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_save_and_reload_every_format(self):
+        """test_save_and_reload_every_format"""
+        for name, serializer in FORMATS.items():
+            with self.subTest(format=name):
+                FileStorage._FileStorage__format = name
+                FileStorage._FileStorage__objects = {}
+                user = User()
+                place = Place()
+                place.amenity_ids = ["wifi"]
+                storage.save()
+                self.assertTrue(os.path.exists("file." +
+                                               serializer.extension))
+                FileStorage._FileStorage__objects = {}
+                storage.reload()
+                objs = storage.all()
+                self.assertEqual(user.to_dict(),
+                                 objs["User." + user.id].to_dict())
+                self.assertEqual(["wifi"],
+                                 objs["Place." + place.id].amenity_ids)
+
+
+class TestFileStorageMapped(unittest.TestCase):
+    """Unittests for FileStorage decoding an indexed snapshot on access"""
+
+    @classmethod
+    def setUp(cls):
+        """Set up test methods"""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__format = "indexed"
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(cls):
+        """Tear down test methods"""
+        FileStorage._FileStorage__format = "json"
+        for name in ("file.indexed", "file.indexed.log"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def remap(self):
+        """saves some objects and reloads them into an empty storage"""
+        self.users = sorted((User() for _ in range(5)), key=lambda u: u.id)
+        self.place = Place()
+        self.place.amenity_ids = ["wifi"]
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+
+    def test_reload_decodes_nothing(self):
+        """test_reload_decodes_nothing"""
+        self.remap()
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+        self.assertEqual(5, storage.count(User))
+        self.assertEqual(6, storage.count())
+        self.assertEqual(6, storage.metrics()["undecoded_objects"])
+
+    def test_get_decodes_one_object(self):
+        """test_get_decodes_one_object"""
+        self.remap()
+        user = storage.get(User, self.users[2].id)
+        self.assertEqual(self.users[2].to_dict(), user.to_dict())
+        self.assertIs(user, storage.get(User, self.users[2].id))
+        self.assertEqual(1, len(FileStorage._FileStorage__objects))
+
+    def test_page_decodes_the_page(self):
+        """test_page_decodes_the_page"""
+        self.remap()
+        page = storage.page(User, limit=2, after=self.users[0].id)
+        self.assertEqual([u.id for u in self.users[1:3]],
+                         [u.id for u in page])
+        self.assertEqual(2, len(FileStorage._FileStorage__objects))
+
+    def test_all_decodes_everything(self):
+        """test_all_decodes_everything"""
+        self.remap()
+        self.assertEqual(5, len(storage.all(User)))
+        objs = storage.all()
+        self.assertEqual(6, len(objs))
+        self.assertEqual(["wifi"],
+                         objs["Place." + self.place.id].amenity_ids)
+        self.assertEqual(0, storage.metrics()["undecoded_objects"])
+
+    def test_save_keeps_undecoded_objects(self):
+        """test_save_keeps_undecoded_objects"""
+        self.remap()
+        user = storage.get(User, self.users[0].id)
+        user.first_name = "Betty"
+        user.save()
+        storage.delete(storage.get(User, self.users[1].id))
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(4, storage.count(User))
+        self.assertEqual("Betty",
+                         storage.get(User, self.users[0].id).first_name)
+        self.assertIsNone(storage.get(User, self.users[1].id))
+        self.assertIsNotNone(storage.get(Place, self.place.id))
+
+    def test_create_and_delete_after_reload(self):
+        """test_create_and_delete_after_reload"""
+        self.remap()
+        user = User()
+        storage.save()
+        self.assertEqual(6, storage.count(User))
+        ids = [u.id for u in storage.page(User)]
+        self.assertEqual(sorted(u.id for u in self.users + [user]), ids)
+        storage.delete(storage.get(User, self.users[0].id))
+        storage.save()
+        self.assertEqual(5, storage.count(User))
+        self.assertEqual(5, len(storage.all(User)))
+        self.assertEqual(5, len(storage.page(User)))
+
+    def test_journal_deletes_undecoded_object(self):
+        """test_journal_deletes_undecoded_object"""
+        self.remap()
+        FileStorage._FileStorage__journal = True
+        try:
+            storage.delete(storage.get(User, self.users[3].id))
+            storage.save()
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+        finally:
+            FileStorage._FileStorage__journal = False
+        self.assertEqual(4, storage.count(User))
+        self.assertNotIn(self.users[3].id,
+                         [u.id for u in storage.page(User)])
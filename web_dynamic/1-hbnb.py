@@ -15,11 +15,15 @@ def states():
     states = storage.all("State")
     amenities = storage.all("Amenity")
     users = storage.all("User")
+    cities = storage.children("City", "state_id")
+    places = storage.children("Place", "user_id")
 
     return render_template("1-hbnb.html",
                            states=states,
                            amenities=amenities,
                            users=users,
+                           cities=cities,
+                           places=places,
                            cache_id=uuid.uuid4())
 
 
@@ -15,11 +15,13 @@ def states():
     states = storage.all("State")
     amenities = storage.all("Amenity")
     users = storage.all("User")
+    cities = storage.children("City", "state_id")
 
     return render_template("100-hbnb.html",
                            states=states,
                            amenities=amenities,
                            users=users,
+                           cities=cities,
                            cache_id=uuid.uuid4())
 
 
@@ -114,14 +114,12 @@ $(document).ready(() => {
               reviewsUl = $('<ul></ul>').appendTo(reviewsSpan.parent().parent());
     
               const placeId = reviewsSpan.attr('place-id');
-              $.get(`http://localhost:5001/api/v1/places/${placeId}/reviews/`, (placeReviews) => {
+              $.get(`http://localhost:5001/api/v1/places/${placeId}/reviews/?expand=user`, (placeReviews) => {
                 placeReviews.forEach(review => {
                   const reviewLi = $('<li></li>').appendTo(reviewsUl);
-                  console.log(typeof review.created_at);
-                  $.get(`http://localhost:5001/api/v1/users/${review.user_id}`, (user) => {
-                    $('<h3></h3>').text(`From ${user.first_name} ${user.last_name} the ${formatDate(review.created_at)}`).appendTo(reviewLi);
-                    $('<p></p>').text(review.text).appendTo(reviewLi);
-                  });
+                  const user = review.user || { first_name: '', last_name: '' };
+                  $('<h3></h3>').text(`From ${user.first_name} ${user.last_name} the ${formatDate(review.created_at)}`).appendTo(reviewLi);
+                  $('<p></p>').text(review.text).appendTo(reviewLi);
                 });
               });
             } else {
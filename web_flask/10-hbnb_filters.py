@@ -13,9 +13,11 @@ def states():
     """Get all state data"""
     states = storage.all("State")
     amenities = storage.all("Amenity")
+    cities = storage.children("City", "state_id")
     return render_template("10-hbnb_filters.html",
                            states=states,
-                           amenities=amenities)
+                           amenities=amenities,
+                           cities=cities)
 
 
 @app.teardown_appcontext
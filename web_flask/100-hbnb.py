@@ -14,11 +14,15 @@ def states():
     states = storage.all("State")
     amenities = storage.all("Amenity")
     users = storage.all("User")
+    cities = storage.children("City", "state_id")
+    places = storage.children("Place", "user_id")
 
     return render_template("100-hbnb.html",
                            states=states,
                            amenities=amenities,
-                           users=users)
+                           users=users,
+                           cities=cities,
+                           places=places)
 
 
 @app.teardown_appcontext
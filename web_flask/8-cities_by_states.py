@@ -11,8 +11,9 @@ app.url_map.strict_slashes = False
 def states():
     """Get all cities by state"""
     all_states = storage.all("State")
+    cities = storage.children("City", "state_id")
     return render_template("8-cities_by_states.html",
-                           states=all_states)
+                           states=all_states, cities=cities)
 
 
 @app.teardown_appcontext
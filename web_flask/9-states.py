@@ -21,8 +21,10 @@ def states_by_id(id):
     """State by id"""
     for state in storage.all("State").values():
         if state.id == id:
+            cities = storage.children("City", "state_id", [id])[id]
             return render_template("9-states.html",
-                                   id=id, state=state, notfound=False)
+                                   id=id, state=state, cities=cities,
+                                   notfound=False)
     return render_template("9-states.html", notfound=True)
 
 